@@ -2,67 +2,113 @@
 AI Instructions Module
 Loads and combines instruction markdown files
 """
+import functools
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 DOCS_DIR = Path(__file__).parent / 'docs'
 
+# Version string in 00_overview.md that gets replaced with the running version
+_VERSION_PLACEHOLDER = '2.6.1'
+
+# Order matters - load in logical sequence
+INSTRUCTION_FILES = (
+    '00_overview.md',
+    '01_explain_before_executing.md',
+    '02_output_formatting.md',
+    '03_critical_safety.md',
+    '04_dashboard_generation.md',
+    '06_conditional_cards.md',
+    '05_api_summary.md',
+    '99_final_reminder.md',
+)
+
+@functools.lru_cache(maxsize=16)
 def load_instruction_file(filename: str) -> str:
-    """Load a single instruction markdown file"""
-    file_path = DOCS_DIR / filename
-    if file_path.exists():
-        return file_path.read_text(encoding='utf-8')
-    return f"<!-- {filename} not found -->\n"
+    """Load a single instruction markdown file (internal - use load_all_instructions)"""
+    try:
+        return (DOCS_DIR / filename).read_bytes().decode('utf-8')
+    except FileNotFoundError:
+        return f"<!-- {filename} not found -->\n"
+
+_SEPARATOR = '\n\n---\n\n'
+
+@functools.lru_cache(maxsize=1)
+def _raw_docs() -> Tuple[str, ...]:
+    """Instruction files in order - read on first use, docs are static at runtime"""
+    return tuple(load_instruction_file(f) for f in INSTRUCTION_FILES)
+
+@functools.lru_cache(maxsize=8)
+def _build(version: str) -> str:
+    """Combine cached instruction files for a given version"""
+    instructions = list(_raw_docs())
+
+    # Replace version placeholder in overview
+    instructions[0] = instructions[0].replace(_VERSION_PLACEHOLDER, version)
+
+    # Combine with separators
+    return _SEPARATOR.join(instructions)
 
-def load_all_instructions(version: str = "2.6.1") -> str:
+@functools.lru_cache(maxsize=1)
+def _split() -> Optional[Tuple[str, str]]:
+    """
+    Split the combined document around the version placeholder
+
+    Only the version token varies between calls, so the common path is a
+    single concatenation. Returns None if the placeholder is not unique.
+    """
+    raw = _raw_docs()
+    combined = _SEPARATOR.join(raw)
+    if combined.count(_VERSION_PLACEHOLDER) != 1 or raw[0].count(_VERSION_PLACEHOLDER) != 1:
+        return None
+    prefix, suffix = combined.split(_VERSION_PLACEHOLDER, 1)
+    return prefix, suffix
+
+def load_all_instructions(version: str = _VERSION_PLACEHOLDER) -> str:
     """
     Load and combine all instruction markdown files into one document
-    
+
+    Docs are read on first call, not at import.
+
     Args:
         version: Agent version to inject into overview
-        
+
     Returns:
         Combined instruction text
     """
-    # Order matters - load in logical sequence
-    instruction_files = [
-        '00_overview.md',
-        '01_explain_before_executing.md',
-        '02_output_formatting.md',
-        '03_critical_safety.md',
-        '04_dashboard_generation.md',
-        '06_conditional_cards.md',
-        '05_api_summary.md',
-        '99_final_reminder.md',
-    ]
-    
-    instructions = []
-    
-    for filename in instruction_files:
-        content = load_instruction_file(filename)
-        
-        # Replace version placeholder in overview
-        if filename == '00_overview.md':
-            content = content.replace('2.6.1', version)
-        
-        instructions.append(content)
-    
-    # Combine with separators
-    combined = '\n\n---\n\n'.join(instructions)
-    
-    return combined
-
-def get_instruction_files() -> List[str]:
-    """Get list of available instruction files"""
-    if not DOCS_DIR.exists():
-        return []
-    return sorted([f.name for f in DOCS_DIR.glob('*.md')])
-
-
-
-
+    split = _split()
+    if split is not None:
+        return split[0] + version + split[1]
+    return _build(version)
 
+def load_instruction_sections(version: str = _VERSION_PLACEHOLDER) -> List[Dict[str, str]]:
+    """
+    Load instruction files as separate sections, in the same order as
+    load_all_instructions
 
+    Args:
+        version: Agent version to inject into overview
 
+    Returns:
+        List of {'name': file name without extension, 'content': markdown}
+    """
+    sections = []
+    for filename, content in zip(INSTRUCTION_FILES, _raw_docs()):
+        if filename == INSTRUCTION_FILES[0]:
+            content = content.replace(_VERSION_PLACEHOLDER, version)
+        sections.append({'name': filename.rsplit('.', 1)[0], 'content': content})
+    return sections
 
+# (docs dir mtime, sorted file names) - rescanned only when the directory changes
+_LIST_CACHE: Tuple[float, Tuple[str, ...]] = (-1.0, ())
 
+def get_instruction_files() -> List[str]:
+    """Get list of available instruction files"""
+    global _LIST_CACHE
+    try:
+        mtime = DOCS_DIR.stat().st_mtime
+    except FileNotFoundError:
+        return []
+    if mtime != _LIST_CACHE[0]:
+        _LIST_CACHE = (mtime, tuple(sorted(f.name for f in DOCS_DIR.glob('*.md'))))
+    return list(_LIST_CACHE[1])
@@ -1,11 +1,13 @@
 """Add-on Management API Endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import asyncio
 import logging
 
 from app.models.schemas import Response
 from app.auth import verify_token
+from app.utils.responses import FastJSONResponse, cached_json_response, json_response, ndjson_response
 from app.services.supervisor_client import get_supervisor_client
 
 logger = logging.getLogger('ha_cursor_agent')
@@ -21,6 +23,48 @@ class RepositoryRequest(BaseModel):
     """Request model for adding repository"""
     repository_url: str
 
+# ==================== Helpers ====================
+
+def _tail_lines(data: bytes, lines: int) -> str:
+    """Decode the last N lines of raw log bytes
+    
+    Scans backwards for newlines and decodes only the tail window,
+    without copying or decoding the rest of the log.
+    """
+    pos = len(data)
+    for _ in range(lines):
+        pos = data.rfind(b'\n', 0, pos)
+        if pos < 0:
+            break
+    return str(memoryview(data)[pos + 1:], 'utf-8', 'replace')
+
+def _extract_list(result: Any, key: str) -> List:
+    """Extract a list from the different Supervisor response formats"""
+    if type(result) is dict:
+        # Format: {key: [...]}
+        if key in result:
+            return result[key]
+        data = result.get('data')
+        # Format: {'data': {key: [...]}} (most common)
+        if type(data) is dict:
+            return data.get(key, [])
+        # Format: {'data': [...]}
+        if type(data) is list:
+            return data
+        return []
+    # Format: direct list
+    if type(result) is list:
+        return result
+    return []
+
+async def _addon_name(supervisor, slug: str) -> str:
+    """Look up an add-on's display name, falling back to its slug"""
+    try:
+        info = await supervisor.get_addon_info(slug)
+    except Exception:
+        return slug
+    return info.get('data', {}).get('name', slug)
+
 # ==================== Endpoints ====================
 
 @router.get("/store", response_model=Response, dependencies=[Depends(verify_token)])
@@ -32,25 +76,13 @@ async def list_store_addons():
     Use this for browsing available add-ons and making recommendations.
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         result = await supervisor.list_store_addons()
         
         # Parse response (may be list or dict)
-        if isinstance(result, list):
-            addons = result
-        elif isinstance(result, dict):
-            if 'addons' in result:
-                addons = result['addons']
-            elif 'data' in result and isinstance(result['data'], list):
-                addons = result['data']
-            elif 'data' in result and isinstance(result['data'], dict):
-                addons = result['data'].get('addons', [])
-            else:
-                addons = []
-        else:
-            addons = []
+        addons = _extract_list(result, 'addons')
         
-        return Response(
+        return json_response(
             success=True,
             message=f"Found {len(addons)} add-ons in store catalog",
             data={
@@ -59,71 +91,96 @@ async def list_store_addons():
             }
         )
     except Exception as e:
-        logger.error(f"Error listing store add-ons: {e}")
+        logger.error("Error listing store add-ons: %s", e, exc_info=True)
         return Response(success=False, message=f"Failed to list store add-ons: {str(e)}")
 
 @router.get("/available", response_model=Response, dependencies=[Depends(verify_token)])
-async def list_available_addons():
+async def list_available_addons(request: Request, include_all: bool = False, stream: bool = False):
     """
     List all available add-ons (installed and available to install)
     
+    Args:
+        include_all: Also return the combined 'all' list (default: False)
+        stream: Return application/x-ndjson - a meta line with counts,
+                then one add-on per line (default: False)
+    
     Returns add-ons from all repositories including:
     - Official add-ons (core, community)
     - Custom repository add-ons
     - Installation status for each
+    
+    Supports conditional requests via ETag / If-None-Match.
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         result = await supervisor.list_addons()
         
         addons = result.get('data', {}).get('addons', [])
         
-        # Separate installed and available
+        # Separate installed and available in a single pass
         # An add-on is installed if it has a 'version' field (current installed version)
-        installed = [a for a in addons if a.get('version')]
-        available = [a for a in addons if not a.get('version')]
+        installed, available = [], []
+        for a in addons:
+            (installed if a.get('version') else available).append(a)
         
-        return Response(
-            success=True,
-            message=f"Found {len(addons)} add-ons ({len(installed)} installed, {len(available)} available)",
-            data={
-                'total': len(addons),
-                'installed_count': len(installed),
-                'available_count': len(available),
+        total, installed_count, available_count = len(addons), len(installed), len(available)
+        
+        if stream:
+            return ndjson_response(
+                {'total': total, 'installed_count': installed_count, 'available_count': available_count},
+                addons
+            )
+        
+        def build():
+            data = {
+                'total': total,
+                'installed_count': installed_count,
+                'available_count': available_count,
                 'installed': installed,
-                'available': available,
-                'all': addons
+                'available': available
             }
-        )
+            # 'all' repeats every add-on a second time - only send it on request
+            if include_all:
+                data['all'] = addons
+            return {
+                'success': True,
+                'message': f"Found {total} add-ons ({installed_count} installed, {available_count} available)",
+                'data': data
+            }
+        
+        return cached_json_response(request, ('addons/available', include_all), result, build)
     except Exception as e:
-        logger.error(f"Error listing add-ons: {e}")
+        logger.error("Error listing add-ons: %s", e, exc_info=True)
         return Response(success=False, message=f"Failed to list add-ons: {str(e)}")
 
 @router.get("/installed", response_model=Response, dependencies=[Depends(verify_token)])
-async def list_installed_addons():
+async def list_installed_addons(request: Request):
     """
     List only installed add-ons
     
-    Returns add-ons that are currently installed on the system
+    Returns add-ons that are currently installed on the system.
+    Supports conditional requests via ETag / If-None-Match.
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         result = await supervisor.list_addons()
         
-        addons = result.get('data', {}).get('addons', [])
-        # An add-on is installed if it has a 'version' field (current installed version)
-        installed = [a for a in addons if a.get('version')]
-        
-        return Response(
-            success=True,
-            message=f"Found {len(installed)} installed add-ons",
-            data={
-                'count': len(installed),
-                'addons': installed
+        def build():
+            addons = result.get('data', {}).get('addons', [])
+            # An add-on is installed if it has a 'version' field (current installed version)
+            installed = [a for a in addons if a.get('version')]
+            return {
+                'success': True,
+                'message': f"Found {len(installed)} installed add-ons",
+                'data': {
+                    'count': len(installed),
+                    'addons': installed
+                }
             }
-        )
+        
+        return cached_json_response(request, 'addons/installed', result, build)
     except Exception as e:
-        logger.error(f"Error listing installed add-ons: {e}")
+        logger.error("Error listing installed add-ons: %s", e, exc_info=True)
         return Response(success=False, message=f"Failed to list installed add-ons: {str(e)}")
 
 @router.get("/{slug}/info", response_model=Response, dependencies=[Depends(verify_token)])
@@ -142,7 +199,7 @@ async def get_addon_info(slug: str):
     - Resource usage
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         result = await supervisor.get_addon_info(slug)
         
         addon_data = result.get('data', {})
@@ -153,7 +210,7 @@ async def get_addon_info(slug: str):
             data=addon_data
         )
     except Exception as e:
-        logger.error(f"Error getting add-on info for {slug}: {e}")
+        logger.error("Error getting add-on info for %s: %s", slug, e, exc_info=True)
         return Response(success=False, message=f"Failed to get add-on info: {str(e)}")
 
 @router.get("/{slug}/logs", dependencies=[Depends(verify_token)])
@@ -169,30 +226,32 @@ async def get_addon_logs(slug: str, lines: Optional[int] = 100):
         Plain text logs
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         logs = await supervisor.get_addon_logs(slug)
         
         # Return last N lines
-        if lines:
-            log_lines = logs.split('\n')
-            logs = '\n'.join(log_lines[-lines:])
+        if lines and lines > 0:
+            logs = _tail_lines(logs, lines)
+        else:
+            logs = logs.decode('utf-8', 'replace')
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "message": f"Logs for {slug}",
             "logs": logs
-        }
+        })
     except Exception as e:
-        logger.error(f"Error getting logs for {slug}: {e}")
+        logger.error("Error getting logs for %s: %s", slug, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get logs: {str(e)}")
 
 @router.post("/{slug}/install", response_model=Response, dependencies=[Depends(verify_token)])
-async def install_addon(slug: str):
+async def install_addon(slug: str, force: bool = False):
     """
     Install an add-on
     
     Args:
         slug: Add-on slug to install
+        force: Skip the "already installed" pre-check (default: False)
     
     Note: Installation can take several minutes depending on add-on size.
           The endpoint will wait for installation to complete.
@@ -201,31 +260,35 @@ async def install_addon(slug: str):
         Installation result
     """
     try:
-        supervisor = await get_supervisor_client()
-        
-        # Check if already installed
-        info = await supervisor.get_addon_info(slug)
-        addon_data = info.get('data', {})
-        
-        if addon_data.get('version'):
-            return Response(
-                success=True,
-                message=f"Add-on '{addon_data.get('name', slug)}' is already installed (version {addon_data.get('version')})",
-                data={
-                    'slug': slug,
-                    'name': addon_data.get('name'),
-                    'version': addon_data.get('version'),
-                    'already_installed': True
-                }
-            )
+        supervisor = get_supervisor_client()
+        
+        # Check if already installed (skipped when caller forces install)
+        if not force:
+            info = await supervisor.get_addon_info(slug)
+            addon_data = info.get('data', {})
+            
+            if addon_data.get('version'):
+                return Response(
+                    success=True,
+                    message=f"Add-on '{addon_data.get('name', slug)}' is already installed (version {addon_data.get('version')})",
+                    data={
+                        'slug': slug,
+                        'name': addon_data.get('name'),
+                        'version': addon_data.get('version'),
+                        'already_installed': True
+                    }
+                )
         
         # Install add-on
         logger.info(f"Starting installation of add-on: {slug}")
         result = await supervisor.install_addon(slug)
         
-        # Get updated info
-        info_after = await supervisor.get_addon_info(slug)
-        addon_after = info_after.get('data', {})
+        # Use the install result if it already reports the installed version,
+        # otherwise fetch updated info
+        addon_after = result.get('data') if isinstance(result, dict) else None
+        if not isinstance(addon_after, dict) or not addon_after.get('version'):
+            info_after = await supervisor.get_addon_info(slug)
+            addon_after = info_after.get('data', {})
         
         return Response(
             success=True,
@@ -240,7 +303,7 @@ async def install_addon(slug: str):
             }
         )
     except Exception as e:
-        logger.error(f"Error installing add-on {slug}: {e}")
+        logger.error("Error installing add-on %s: %s", slug, e, exc_info=True)
         return Response(success=False, message=f"Failed to install add-on: {str(e)}")
 
 @router.post("/{slug}/uninstall", response_model=Response, dependencies=[Depends(verify_token)])
@@ -254,15 +317,13 @@ async def uninstall_addon(slug: str):
     Warning: This will remove the add-on and its data!
     """
     try:
-        supervisor = await get_supervisor_client()
-        
-        # Get info before uninstalling
-        info = await supervisor.get_addon_info(slug)
-        addon_data = info.get('data', {})
-        addon_name = addon_data.get('name', slug)
+        supervisor = get_supervisor_client()
         
-        # Uninstall
-        await supervisor.uninstall_addon(slug)
+        # Name lookup is cosmetic - overlap it with the uninstall
+        addon_name, _ = await asyncio.gather(
+            _addon_name(supervisor, slug),
+            supervisor.uninstall_addon(slug)
+        )
         
         return Response(
             success=True,
@@ -270,83 +331,50 @@ async def uninstall_addon(slug: str):
             data={'slug': slug, 'name': addon_name}
         )
     except Exception as e:
-        logger.error(f"Error uninstalling add-on {slug}: {e}")
+        logger.error("Error uninstalling add-on %s: %s", slug, e, exc_info=True)
         return Response(success=False, message=f"Failed to uninstall add-on: {str(e)}")
 
-@router.post("/{slug}/start", response_model=Response, dependencies=[Depends(verify_token)])
-async def start_addon(slug: str):
-    """
-    Start an add-on
-    
-    Args:
-        slug: Add-on slug to start
-    """
+# action -> (supervisor method, past tense, progressive form)
+_ADDON_ACTIONS = {
+    'start': ('start_addon', 'started', 'starting'),
+    'stop': ('stop_addon', 'stopped', 'stopping'),
+    'restart': ('restart_addon', 'restarted', 'restarting'),
+}
+
+async def _addon_action(slug: str, action: str) -> Response:
+    """Run a start/stop/restart action and build the response"""
+    method, state, progressive = _ADDON_ACTIONS[action]
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         
-        info = await supervisor.get_addon_info(slug)
-        addon_name = info.get('data', {}).get('name', slug)
-        
-        await supervisor.start_addon(slug)
+        addon_name, _ = await asyncio.gather(
+            _addon_name(supervisor, slug),
+            getattr(supervisor, method)(slug)
+        )
         
         return Response(
             success=True,
-            message=f"Add-on '{addon_name}' started successfully",
-            data={'slug': slug, 'name': addon_name, 'state': 'started'}
+            message=f"Add-on '{addon_name}' {state} successfully",
+            data={'slug': slug, 'name': addon_name, 'state': state}
         )
     except Exception as e:
-        logger.error(f"Error starting add-on {slug}: {e}")
-        return Response(success=False, message=f"Failed to start add-on: {str(e)}")
+        logger.error("Error %s add-on %s: %s", progressive, slug, e, exc_info=True)
+        return Response(success=False, message=f"Failed to {action} add-on: {str(e)}")
+
+@router.post("/{slug}/start", response_model=Response, dependencies=[Depends(verify_token)])
+async def start_addon(slug: str):
+    """Start an add-on"""
+    return await _addon_action(slug, 'start')
 
 @router.post("/{slug}/stop", response_model=Response, dependencies=[Depends(verify_token)])
 async def stop_addon(slug: str):
-    """
-    Stop an add-on
-    
-    Args:
-        slug: Add-on slug to stop
-    """
-    try:
-        supervisor = await get_supervisor_client()
-        
-        info = await supervisor.get_addon_info(slug)
-        addon_name = info.get('data', {}).get('name', slug)
-        
-        await supervisor.stop_addon(slug)
-        
-        return Response(
-            success=True,
-            message=f"Add-on '{addon_name}' stopped successfully",
-            data={'slug': slug, 'name': addon_name, 'state': 'stopped'}
-        )
-    except Exception as e:
-        logger.error(f"Error stopping add-on {slug}: {e}")
-        return Response(success=False, message=f"Failed to stop add-on: {str(e)}")
+    """Stop an add-on"""
+    return await _addon_action(slug, 'stop')
 
 @router.post("/{slug}/restart", response_model=Response, dependencies=[Depends(verify_token)])
 async def restart_addon(slug: str):
-    """
-    Restart an add-on
-    
-    Args:
-        slug: Add-on slug to restart
-    """
-    try:
-        supervisor = await get_supervisor_client()
-        
-        info = await supervisor.get_addon_info(slug)
-        addon_name = info.get('data', {}).get('name', slug)
-        
-        await supervisor.restart_addon(slug)
-        
-        return Response(
-            success=True,
-            message=f"Add-on '{addon_name}' restarted successfully",
-            data={'slug': slug, 'name': addon_name, 'state': 'restarted'}
-        )
-    except Exception as e:
-        logger.error(f"Error restarting add-on {slug}: {e}")
-        return Response(success=False, message=f"Failed to restart add-on: {str(e)}")
+    """Restart an add-on"""
+    return await _addon_action(slug, 'restart')
 
 @router.post("/{slug}/update", response_model=Response, dependencies=[Depends(verify_token)])
 async def update_addon(slug: str):
@@ -359,7 +387,7 @@ async def update_addon(slug: str):
     Note: Update can take several minutes.
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         
         info_before = await supervisor.get_addon_info(slug)
         addon_data = info_before.get('data', {})
@@ -383,7 +411,7 @@ async def update_addon(slug: str):
             }
         )
     except Exception as e:
-        logger.error(f"Error updating add-on {slug}: {e}")
+        logger.error("Error updating add-on %s: %s", slug, e, exc_info=True)
         return Response(success=False, message=f"Failed to update add-on: {str(e)}")
 
 @router.get("/{slug}/options", response_model=Response, dependencies=[Depends(verify_token)])
@@ -395,7 +423,7 @@ async def get_addon_options(slug: str):
         slug: Add-on slug
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         options = await supervisor.get_addon_options(slug)
         
         return Response(
@@ -404,7 +432,7 @@ async def get_addon_options(slug: str):
             data={'options': options}
         )
     except Exception as e:
-        logger.error(f"Error getting options for {slug}: {e}")
+        logger.error("Error getting options for %s: %s", slug, e, exc_info=True)
         return Response(success=False, message=f"Failed to get add-on options: {str(e)}")
 
 @router.post("/{slug}/options", response_model=Response, dependencies=[Depends(verify_token)])
@@ -419,12 +447,12 @@ async def set_addon_options(slug: str, request: AddonOptionsRequest):
     Note: Add-on may need to be restarted for changes to take effect
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         
-        info = await supervisor.get_addon_info(slug)
-        addon_name = info.get('data', {}).get('name', slug)
-        
-        await supervisor.set_addon_options(slug, request.options)
+        addon_name, _ = await asyncio.gather(
+            _addon_name(supervisor, slug),
+            supervisor.set_addon_options(slug, request.options)
+        )
         
         return Response(
             success=True,
@@ -437,7 +465,7 @@ async def set_addon_options(slug: str, request: AddonOptionsRequest):
             }
         )
     except Exception as e:
-        logger.error(f"Error setting options for {slug}: {e}")
+        logger.error("Error setting options for %s: %s", slug, e, exc_info=True)
         return Response(success=False, message=f"Failed to set add-on options: {str(e)}")
 
 @router.get("/repositories", response_model=Response, dependencies=[Depends(verify_token)])
@@ -446,35 +474,19 @@ async def list_repositories():
     List all add-on repositories
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         result = await supervisor.list_repositories()
         
         # Supervisor API may return different formats
-        if isinstance(result, list):
-            # Format 1: Direct list
-            repos = result
-        elif isinstance(result, dict):
-            # Format 2: {'repositories': [...]}
-            if 'repositories' in result:
-                repos = result['repositories']
-            # Format 3: {'data': [...]} (data is list)
-            elif 'data' in result and isinstance(result['data'], list):
-                repos = result['data']
-            # Format 4: {'data': {'repositories': [...]}}
-            elif 'data' in result and isinstance(result['data'], dict):
-                repos = result['data'].get('repositories', [])
-            else:
-                repos = []
-        else:
-            repos = []
+        repos = _extract_list(result, 'repositories')
         
-        return Response(
+        return json_response(
             success=True,
             message=f"Found {len(repos)} repositories",
             data={'count': len(repos), 'repositories': repos}
         )
     except Exception as e:
-        logger.error(f"Error listing repositories: {e}")
+        logger.error("Error listing repositories: %s", e, exc_info=True)
         return Response(success=False, message=f"Failed to list repositories: {str(e)}")
 
 @router.post("/repositories/add", response_model=Response, dependencies=[Depends(verify_token)])
@@ -486,7 +498,7 @@ async def add_repository(request: RepositoryRequest):
         request: Repository URL to add
     """
     try:
-        supervisor = await get_supervisor_client()
+        supervisor = get_supervisor_client()
         await supervisor.add_repository(request.repository_url)
         
         return Response(
@@ -495,6 +507,6 @@ async def add_repository(request: RepositoryRequest):
             data={'repository_url': request.repository_url}
         )
     except Exception as e:
-        logger.error(f"Error adding repository {request.repository_url}: {e}")
+        logger.error("Error adding repository %s: %s", request.repository_url, e, exc_info=True)
         return Response(success=False, message=f"Failed to add repository: {str(e)}")
 
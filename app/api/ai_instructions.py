@@ -2,12 +2,66 @@
 AI Instructions API
 Provides detailed instructions for AI assistants (like Cursor AI)
 """
-from fastapi import APIRouter
+import functools
+import gzip
+from typing import Dict, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import PlainTextResponse
-from app.ai_instructions import load_all_instructions
+from app.ai_instructions import load_all_instructions, load_instruction_sections
+from app.utils.responses import accepts_encoding, conditional_response, etag_matches, json_dumps, make_etag
 
 router = APIRouter(tags=["AI Instructions"])
 
+MEDIA_TYPE = "text/plain"  # Starlette appends "; charset=utf-8"
+CACHE_CONTROL = "public, max-age=3600"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@functools.lru_cache(maxsize=4)
+def _instructions_payload(version: str) -> Tuple[bytes, str, bytes, str]:
+    """
+    Encode and gzip instructions for a version once
+
+    Returns:
+        (body, etag, gzipped body, gzip etag)
+    """
+    body = load_all_instructions(version=version).encode('utf-8')
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    return body, make_etag(body), gz, make_etag(gz)
+
+
+def _agent_version() -> str:
+    """Running agent version"""
+    # Imported lazily - app.main imports this router
+    from app.main import AGENT_VERSION
+    return AGENT_VERSION
+
+
+@functools.lru_cache(maxsize=2)
+def _current_variants(cache_control: str = CACHE_CONTROL) -> Dict[bool, Tuple[bytes, str, Dict[str, str]]]:
+    """
+    Prebuilt (body, etag, headers) for the running agent version
+
+    Keyed by whether the client accepts gzip. Header dicts are built once;
+    Response objects themselves are not shared between requests because
+    middleware (e.g. CORS) mutates the header list of the response it sends.
+    """
+    body, etag, gz, gz_etag = _instructions_payload(_agent_version())
+    return {
+        False: (body, etag, {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}),
+        True: (gz, gz_etag, {"ETag": gz_etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding",
+                             "Content-Encoding": "gzip"}),
+    }
+
+
+def _instructions_response(request: Request, cache_control: str = CACHE_CONTROL) -> Response:
+    """Pick the prebuilt variant for this request, or 304 if the client has it"""
+    body, etag, headers = _current_variants(cache_control)[accepts_encoding(request, 'gzip')]
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=MEDIA_TYPE, headers=headers)
+
 
 @router.get(
     "/instructions",
@@ -15,20 +69,70 @@ router = APIRouter(tags=["AI Instructions"])
     summary="Get AI Assistant Instructions",
     description="Returns detailed instructions for AI assistants on how to safely use this API"
 )
-async def get_ai_instructions():
+async def get_ai_instructions(request: Request):
     """
     Get complete instructions for AI assistants (like Cursor AI).
-    
+
     Instructions are loaded from markdown files in app/ai_instructions/docs/
-    
+
     This endpoint provides:
     - Safety protocols
     - Step-by-step workflow
     - Best practices
     - Error handling guidelines
     - Dashboard generation guides
-    
+
     Returns plain text for easy consumption by AI.
+    Supports conditional requests via ETag / If-None-Match, and serves a
+    precompressed body to clients that accept gzip.
     """
-    from app.main import AGENT_VERSION
-    return load_all_instructions(version=AGENT_VERSION)
+    # Deliberately async: nothing here blocks, and a plain def would be
+    # dispatched to the threadpool on every request
+    return _instructions_response(request)
+
+
+@router.get(
+    "/instructions/v{version}",
+    response_class=PlainTextResponse,
+    summary="Get AI Assistant Instructions (versioned, cacheable)",
+    description="Same as /instructions, pinned to an agent version and cacheable forever"
+)
+async def get_ai_instructions_versioned(version: str, request: Request):
+    """
+    Get instructions for a specific agent version.
+
+    Content at a versioned URL never changes, so it is served with
+    Cache-Control: immutable and clients don't need to revalidate.
+    Only the running agent version is available (404 otherwise).
+    """
+    if version != _agent_version():
+        raise HTTPException(status_code=404, detail=f"Instructions for version {version} not available")
+    return _instructions_response(request, IMMUTABLE_CACHE_CONTROL)
+
+
+@functools.lru_cache(maxsize=1)
+def _current_json_payload() -> Tuple[bytes, str]:
+    """Encoded JSON instructions and ETag for the running agent version"""
+    version = _agent_version()
+    body = json_dumps({
+        'version': version,
+        'sections': load_instruction_sections(version=version)
+    })
+    return body, make_etag(body)
+
+
+@router.get(
+    "/instructions.json",
+    summary="Get AI Assistant Instructions (JSON)",
+    description="Same instructions as /instructions, split into named sections"
+)
+async def get_ai_instructions_json(request: Request):
+    """
+    Get instructions for AI assistants as structured JSON.
+
+    Returns {"version": ..., "sections": [{"name": ..., "content": ...}]}
+    with one section per instruction markdown file, in reading order.
+    Supports conditional requests via ETag / If-None-Match.
+    """
+    body, etag = _current_json_payload()
+    return conditional_response(request, body, etag, "application/json", CACHE_CONTROL)
@@ -1,6 +1,12 @@
 """Automations API endpoints"""
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from anyio import to_thread
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from typing import Dict, List, Optional, Set, Tuple
+import functools
+import os
+import re
+import sys
 import yaml
 import logging
 
@@ -9,27 +15,219 @@ from app.services.file_manager import file_manager
 from app.services.ha_client import ha_client
 from app.services.git_manager import git_manager
 from app.services.ha_websocket import get_ws_client
+from app.utils.responses import FastJSONResponse, cached_json_response
 
-router = APIRouter()
+try:
+    # libyaml-backed loader/dumper, much faster on large files
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+# Loader/dumper options bound once (layout used for automations.yaml)
+_LOAD = functools.partial(yaml.load, Loader=_Loader)
+_DUMP = functools.partial(yaml.dump, Dumper=_Dumper, allow_unicode=True, default_flow_style=False, sort_keys=False)
+
+router = APIRouter(default_response_class=FastJSONResponse)
 logger = logging.getLogger('ha_cursor_agent')
 
+AUTOMATIONS_FILE = 'automations.yaml'
+# Resolved once - the config directory doesn't change at runtime
+AUTOMATIONS_PATH = str(file_manager.resolve(AUTOMATIONS_FILE))
+
+# Request-only fields that aren't part of the automation config
+_DUMP_EXCLUDE = frozenset({'commit_message'})
+_AUTOMATION_LIST_ADAPTER = TypeAdapter(List[AutomationData])
+
+# Clients may keep /list but must revalidate (ETag) before reusing it
+LIST_CACHE_CONTROL = 'private, max-age=0, must-revalidate'
+
+# path -> ((st_mtime_ns, st_size), parsed automations, automation ids)
+_LIST_CACHE: Dict[str, Tuple[Tuple[int, int], List, Set[str]]] = {}
+
+# Frequent values worth sharing across automations (keys are always interned)
+_INTERN_VALUES = frozenset({
+    'single', 'restart', 'queued', 'parallel',
+    'state', 'numeric_state', 'time', 'time_pattern', 'template', 'event',
+    'sun', 'zone', 'device', 'homeassistant', 'mqtt', 'webhook',
+    'on', 'off', 'and', 'or', 'not',
+})
+
+def _intern_strings(obj):
+    """Share one str object per distinct mapping key (and common value)"""
+    if type(obj) is dict:
+        return {(sys.intern(k) if type(k) is str else k): _intern_strings(v) for k, v in obj.items()}
+    if type(obj) is list:
+        return [_intern_strings(v) for v in obj]
+    if type(obj) is str and obj in _INTERN_VALUES:
+        return sys.intern(obj)
+    return obj
+
+def _load_yaml(content: str):
+    """Parse YAML content (safe loader), interning repeated keys"""
+    return _intern_strings(_LOAD(content))
+
+# Files larger than this are parsed in a worker thread so the event loop stays responsive
+_THREAD_THRESHOLD = 16 * 1024
+
+async def _parse_automations(content: str):
+    """_load_yaml, off the event loop for large files"""
+    if len(content) > _THREAD_THRESHOLD:
+        return await to_thread.run_sync(_load_yaml, content)
+    return _load_yaml(content)
+
+def _dump_yaml(data, stream=None) -> Optional[str]:
+    """Serialize data in the layout used for automations.yaml (into stream if given)"""
+    return _DUMP(data, stream)
+
+def _stat_key(full_path: str) -> Tuple[int, int]:
+    """Cache key for a file: (mtime in ns, size)"""
+    st = os.stat(full_path)
+    return st.st_mtime_ns, st.st_size
+
+def _collect_ids(automations) -> Set[str]:
+    """IDs of the automations in a parsed file"""
+    if not isinstance(automations, list):
+        return set()
+    return {a['id'] for a in automations if isinstance(a, dict) and a.get('id') is not None}
+
+async def _load_automations_entry() -> Tuple[Tuple[int, int], List, Set[str]]:
+    """
+    (stat key, parsed automations.yaml, automation IDs), re-parsed only when the file changes
+
+    The cache is keyed on mtime+size, so edits made outside the agent
+    (HA UI, file API) are picked up on the next call.
+    Raises FileNotFoundError if the file doesn't exist.
+    """
+    key = _stat_key(AUTOMATIONS_PATH)
+
+    entry = _LIST_CACHE.get(AUTOMATIONS_PATH)
+    if entry is not None and entry[0] == key:
+        return entry
+
+    content = await file_manager.read_file(AUTOMATIONS_FILE)
+    automations = await _parse_automations(content) or []
+    entry = _LIST_CACHE[AUTOMATIONS_PATH] = (key, automations, _collect_ids(automations))
+    return entry
+
+async def _load_automations_cached() -> List:
+    """Parsed automations.yaml (see _load_automations_entry)"""
+    return (await _load_automations_entry())[1]
+
+async def _load_automations_for_update() -> Tuple[List, Set[str]]:
+    """Cached automations and IDs for create endpoints; empty if the file doesn't exist yet"""
+    try:
+        _, automations, ids = await _load_automations_entry()
+    except FileNotFoundError:
+        return [], set()
+    if not isinstance(automations, list):
+        raise ValueError("automations.yaml must contain a list of automations")
+    return automations, ids
+
+# Start of any top-level line that isn't a comment
+_TOP_LEVEL_LINE = re.compile(r'(?m)^[^\s#]')
+# Top-level line that isn't a comment or a "- " block sequence entry
+_NON_ENTRY_TOP_LEVEL_LINE = re.compile(r'(?m)^(?!-(?:[ \t]|$))[^\s#]')
+
+def _is_block_list(content: str) -> bool:
+    """
+    Whether content is a block sequence with its entries at column 0
+
+    Only then can "- id: ..." fragments be appended to it; flow lists
+    ("[...]"), indented sequences and document markers need a rewrite.
+    """
+    return _TOP_LEVEL_LINE.search(content) is not None and _NON_ENTRY_TOP_LEVEL_LINE.search(content) is None
+
+async def _automations_appendable() -> bool:
+    """_is_block_list for automations.yaml, off the event loop for large files"""
+    content = await file_manager.read_file(AUTOMATIONS_FILE)
+    if len(content) > _THREAD_THRESHOLD:
+        return await to_thread.run_sync(_is_block_list, content)
+    return _is_block_list(content)
+
+def _splice_out_automation(content: str, automation_id: str) -> Optional[str]:
+    """
+    Remove the "- id: <automation_id>" entry from automations.yaml text
+
+    Every other byte is kept as-is, including comments directly above the
+    next entry. Returns None when the entry can't be located unambiguously
+    (flow style, id not the first key, duplicate ids...), in which case the
+    caller should fall back to load/dump.
+    """
+    start_re = re.compile(r'(?m)^-[ \t]+id:[ \t]*(["\']?)' + re.escape(automation_id) + r'\1[ \t]*$')
+    matches = list(start_re.finditer(content))
+    if len(matches) != 1:
+        return None
+    start = matches[0].start()
+    body_start = content.find('\n', matches[0].end()) + 1 or len(content)
+
+    next_entry = _TOP_LEVEL_LINE.search(content, body_start)
+    if next_entry is None:
+        return content[:start]
+    if not content.startswith('-', next_entry.start()):
+        return None
+    end = next_entry.start()
+
+    # Leave top-level comments right above the next entry in place
+    lines = content[body_start:end].splitlines(keepends=True)
+    kept = []
+    while lines and (lines[-1].startswith('#') or not lines[-1].strip()):
+        kept.append(lines.pop())
+    while kept and not kept[-1].strip():
+        lines.append(kept.pop())
+    end = body_start + sum(map(len, lines))
+
+    return content[:start] + content[end:]
+
+def _invalidate_list_cache():
+    """Drop cached automations after this module rewrote the file"""
+    _LIST_CACHE.clear()
+
+async def _add_automations(automations: List, ids: Set[str], new_automations: List[Dict], commit_msg: str):
+    """
+    Add entries to automations.yaml with a single write
+
+    Args:
+        automations: Current parsed file content (as from _load_automations_for_update)
+        ids: IDs of automations
+        new_automations: Automation configs to add
+        commit_msg: Git commit message
+    """
+    if automations and await _automations_appendable():
+        # Append just the new entries - the existing file is a non-empty
+        # column-0 block list, so "- id: ..." fragments extend it in place
+        await file_manager.append_file(AUTOMATIONS_FILE, _dump_yaml(new_automations),
+                                       commit_message=commit_msg, create_backup=True)
+        automations.extend(new_automations)
+        ids.update(_collect_ids(new_automations))
+        _LIST_CACHE[AUTOMATIONS_PATH] = (_stat_key(AUTOMATIONS_PATH), automations, ids)
+    else:
+        # Missing/empty file, or a layout appending would break - write it from scratch
+        content = automations + new_automations
+        await file_manager.write_file_stream(AUTOMATIONS_FILE, lambda f: _dump_yaml(content, f),
+                                             create_backup=True, commit_message=commit_msg)
+        _invalidate_list_cache()
+
 @router.get("/list")
-async def list_automations():
+async def list_automations(request: Request):
     """
     List all automations
     
     Returns automations from automations.yaml
+    
+    The response carries an ETag; send it back in If-None-Match to get
+    304 Not Modified when nothing changed.
     """
     try:
-        # Read automations.yaml
-        content = await file_manager.read_file('automations.yaml')
-        automations = yaml.safe_load(content) or []
+        # Read automations.yaml (cached until the file changes)
+        key, automations, _ = await _load_automations_entry()
         
-        return {
+        # JSON is encoded once per file version: the stat key tuple is only
+        # replaced when the file changes, so it identifies the cached body
+        return cached_json_response(request, 'automations/list', key, lambda: {
             "success": True,
             "count": len(automations),
             "automations": automations
-        }
+        }, cache_control=LIST_CACHE_CONTROL)
     except FileNotFoundError:
         return {"success": True, "count": 0, "automations": []}
     except Exception as e:
@@ -69,29 +267,20 @@ async def create_automation(automation: AutomationData):
     """
     try:
         # Read existing automations
-        try:
-            content = await file_manager.read_file('automations.yaml')
-            automations = yaml.safe_load(content) or []
-        except FileNotFoundError:
-            automations = []
+        automations, ids = await _load_automations_for_update()
         
         # Check if ID already exists
-        if automation.id and any(a.get('id') == automation.id for a in automations):
+        if automation.id and automation.id in ids:
             raise ValueError(f"Automation with ID '{automation.id}' already exists")
         
         # Add new automation (exclude commit_message as it's not part of automation config)
-        new_automation = automation.model_dump(exclude_none=True)
-        # Remove commit_message if present (it's only for Git, not part of automation config)
-        new_automation.pop('commit_message', None)
-        automations.append(new_automation)
-        
-        # Write back
-        new_content = yaml.dump(automations, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        new_automation = automation.model_dump(exclude=_DUMP_EXCLUDE, exclude_none=True)
         commit_msg = automation.commit_message or f"Create automation: {automation.alias}"
-        await file_manager.write_file('automations.yaml', new_content, create_backup=True, commit_message=commit_msg)
+        
+        await _add_automations(automations, ids, [new_automation], commit_msg)
         
         # Reload automations
-        await ha_client.reload_component('automations')
+        await ha_client.schedule_reload('automations')
         
         logger.info(f"Created automation: {automation.alias}")
         
@@ -104,6 +293,66 @@ async def create_automation(automation: AutomationData):
         logger.error(f"Failed to create automation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk_create", response_model=Response)
+async def bulk_create_automations(automations_data: List[AutomationData]):
+    """
+    Create several automations at once
+    
+    Same as /create for each item, but automations.yaml is written (and
+    committed) once and automations are reloaded once for the whole batch.
+    Items whose ID already exists - in the file or earlier in the batch -
+    are skipped and reported in the per-item results.
+    
+    **Example request:**
+    ```json
+    [
+      {"id": "hall_light_on", "alias": "Hall light on", "trigger": [...], "action": [...]},
+      {"id": "hall_light_off", "alias": "Hall light off", "trigger": [...], "action": [...]}
+    ]
+    ```
+    """
+    try:
+        # Read existing automations
+        automations, ids = await _load_automations_for_update()
+        
+        batch_ids = set()
+        accepted = []
+        results = []
+        for automation in automations_data:
+            if automation.id and (automation.id in ids or automation.id in batch_ids):
+                results.append({"id": automation.id, "alias": automation.alias, "status": "skipped",
+                                "error": f"Automation with ID '{automation.id}' already exists"})
+                continue
+            batch_ids.add(automation.id)
+            accepted.append(automation)
+            results.append({"id": automation.id, "alias": automation.alias, "status": "created"})
+        
+        # Serialize the accepted automations in one call
+        new_automations = _AUTOMATION_LIST_ADAPTER.dump_python(
+            accepted, exclude={'__all__': _DUMP_EXCLUDE}, exclude_none=True)
+        
+        if new_automations:
+            # One commit for the batch: custom messages (deduplicated) or a summary
+            messages = list(dict.fromkeys(a.commit_message for a in automations_data if a.commit_message))
+            commit_msg = "; ".join(messages) or \
+                f"Create {len(new_automations)} automations: " + ", ".join(a['alias'] for a in new_automations)
+            await _add_automations(automations, ids, new_automations, commit_msg)
+            
+            # Reload once for the whole batch
+            await ha_client.schedule_reload('automations')
+        
+        logger.info(f"Bulk created {len(new_automations)}/{len(automations_data)} automations")
+        
+        return Response(
+            success=True,
+            message=f"Created {len(new_automations)} of {len(automations_data)} automations" +
+                    (" and reloaded" if new_automations else ""),
+            data={"created": len(new_automations), "results": results}
+        )
+    except Exception as e:
+        logger.error(f"Failed to bulk create automations: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/delete/{automation_id}")
 async def delete_automation(automation_id: str, commit_message: Optional[str] = Query(None, description="Custom commit message for Git backup")):
     """
@@ -114,23 +363,40 @@ async def delete_automation(automation_id: str, commit_message: Optional[str] =
     """
     try:
         # Read automations
-        content = await file_manager.read_file('automations.yaml')
-        automations = yaml.safe_load(content) or []
+        content = await file_manager.read_file(AUTOMATIONS_FILE)
+        commit_msg = commit_message or f"Delete automation: {automation_id}"
         
-        # Find and remove
-        original_count = len(automations)
-        automations = [a for a in automations if a.get('id') != automation_id]
+        # Cached parse of the content we just read, if there is one
+        entry = _LIST_CACHE.get(AUTOMATIONS_PATH)
+        if entry is not None and entry[0] != _stat_key(AUTOMATIONS_PATH):
+            entry = None
         
-        if len(automations) == original_count:
-            raise HTTPException(status_code=404, detail=f"Automation not found: {automation_id}")
+        # Cut the entry out of the text, leaving the rest of the file untouched
+        new_content = _splice_out_automation(content, automation_id)
+        if new_content is not None:
+            writer = lambda f: f.write(new_content)
+            automations = None
+            if entry is not None and isinstance(entry[1], list):
+                automations = [a for a in entry[1] if not (isinstance(a, dict) and a.get('id') == automation_id)]
+        else:
+            # Fall back to a full load -> filter -> dump
+            automations = await _parse_automations(content) or []
+            original_count = len(automations)
+            automations = [a for a in automations if a.get('id') != automation_id]
+            
+            if len(automations) == original_count:
+                raise HTTPException(status_code=404, detail=f"Automation not found: {automation_id}")
+            writer = lambda f: _dump_yaml(automations, f)
         
         # Write back
-        new_content = yaml.dump(automations, allow_unicode=True, default_flow_style=False, sort_keys=False)
-        commit_msg = commit_message or f"Delete automation: {automation_id}"
-        await file_manager.write_file('automations.yaml', new_content, create_backup=True, commit_message=commit_msg)
+        await file_manager.write_file_stream(AUTOMATIONS_FILE, writer, create_backup=True, commit_message=commit_msg)
+        if automations is not None:
+            _LIST_CACHE[AUTOMATIONS_PATH] = (_stat_key(AUTOMATIONS_PATH), automations, _collect_ids(automations))
+        else:
+            _invalidate_list_cache()
         
         # Reload
-        await ha_client.reload_component('automations')
+        await ha_client.schedule_reload('automations')
         
         # Try to remove entity from Entity Registry (if it exists)
         # This cleans up "orphaned" registry entries that may remain after deletion
@@ -4,9 +4,10 @@ from typing import List, Optional
 import logging
 
 from app.models.schemas import BackupRequest, RollbackRequest, Response
-from app.services.git_manager import git_manager
+from app.services.git_manager import build_diff_index, git_manager
+from app.utils.responses import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 logger = logging.getLogger('ha_cursor_agent')
 
 @router.post("/commit", response_model=Response)
@@ -155,24 +156,35 @@ async def rollback_to_commit_body(rollback: RollbackRequest):
 @router.get("/diff")
 async def get_diff(
     commit1: str = None,
-    commit2: str = None
+    commit2: str = None,
+    name_status: bool = Query(False, description="Only list changed files (status<TAB>path per line), no patch"),
+    index: bool = Query(False, description="Also return per-file line offsets of the patch (file header and hunks)")
 ):
     """
     Get diff between commits or current changes
     
+    With `index=true` the response also contains `index`: one entry per file
+    with `path`, `line` (line of its `diff --git` header), `added`, `removed`
+    and `hunk_offsets` (lines of its `@@` hunk headers), 0-based within `diff`.
+    
     **Examples:**
     - `/api/backup/diff` - Current uncommitted changes
     - `/api/backup/diff?commit1=a1b2c3d4` - Changes since commit
     - `/api/backup/diff?commit1=a1b2c3d4&commit2=e5f6g7h8` - Between two commits
+    - `/api/backup/diff?commit1=a1b2c3d4&name_status=true` - Only which files changed (much faster)
+    - `/api/backup/diff?commit1=a1b2c3d4&index=true` - Patch plus file/hunk offsets
     """
     try:
         
-        diff = await git_manager.get_diff(commit1, commit2)
+        diff = await git_manager.get_diff(commit1, commit2, name_status=name_status)
         
-        return {
+        result = {
             "success": True,
             "diff": diff
         }
+        if index and not name_status:
+            result["index"] = build_diff_index(diff)
+        return result
     except Exception as e:
         logger.error(f"Failed to get diff: {e}")
         raise HTTPException(status_code=500, detail=str(e))
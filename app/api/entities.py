@@ -4,8 +4,9 @@ from typing import List, Optional, Dict, Any
 import logging
 
 from app.services.ha_client import ha_client
+from app.utils.responses import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 logger = logging.getLogger('ha_cursor_agent')
 
 @router.get("/list")
@@ -22,27 +23,29 @@ async def list_entities(
     - `/api/entities/list?search=bedroom` - Search for 'bedroom'
     """
     try:
-        states = await ha_client.get_states()
+        # Lowercased search keys and domain positions are precomputed per states fetch
+        all_states, search_keys, by_domain = await ha_client.get_states_indexed()
         
-        # Filter by domain
         if domain:
-            states = [s for s in states if s['entity_id'].startswith(f"{domain}.")]
-        
-        # Search
-        if search:
+            positions = by_domain.get(domain, ())
+            if search:
+                search_lower = search.lower()
+                states = [all_states[i] for i in positions if search_lower in search_keys[i]]
+            else:
+                states = [all_states[i] for i in positions]
+        elif search:
             search_lower = search.lower()
-            states = [
-                s for s in states 
-                if search_lower in s['entity_id'].lower() or 
-                   search_lower in s.get('attributes', {}).get('friendly_name', '').lower()
-            ]
+            states = [s for s, key in zip(all_states, search_keys) if search_lower in key]
+        else:
+            states = all_states
         
         logger.info(f"Listed {len(states)} entities")
-        return {
+        # Returned directly - states are plain JSON from HA, no jsonable_encoder pass needed
+        return FastJSONResponse({
             "success": True,
             "count": len(states),
             "entities": states
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to list entities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
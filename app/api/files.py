@@ -1,15 +1,84 @@
 """Files API endpoints"""
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
+import aiofiles
 import logging
+import mimetypes
 
 from app.models.schemas import FileContent, FileAppend, Response
 from app.services.file_manager import file_manager
-from app.services.git_manager import git_manager
+from app.utils.responses import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 logger = logging.getLogger('ha_cursor_agent')
 
+RAW_CHUNK_SIZE = 64 * 1024
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" Range header
+    
+    Returns:
+        (start, end) inclusive, (-1, -1) if the range can't be satisfied,
+        or None if the header should be ignored (invalid / multiple ranges)
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            # Suffix range: last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                return -1, -1
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        return -1, -1
+    return start, min(end, size - 1)
+
+async def _raw_file_response(request: Request, path: str) -> StreamingResponse:
+    """Stream file bytes in chunks, honouring a single Range request"""
+    full_path = file_manager.resolve(path)
+    if not full_path.is_file():
+        raise HTTPException(status_code=404, detail=f"File not found: {path}")
+    
+    size = full_path.stat().st_size
+    start, end = 0, size - 1
+    status_code = 200
+    headers = {"Accept-Ranges": "bytes"}
+    
+    range_header = request.headers.get('range')
+    if range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range == (-1, -1):
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                                headers={"Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    async def chunks():
+        async with aiofiles.open(full_path, 'rb') as f:
+            await f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await f.read(min(RAW_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    
+    media_type = mimetypes.guess_type(full_path.name)[0] or "text/plain"
+    return StreamingResponse(chunks(), status_code=status_code, media_type=media_type, headers=headers)
+
 @router.get("/list")
 async def list_files(
     directory: str = Query("", description="Directory to list (relative to /config)"),
@@ -36,22 +105,40 @@ async def list_files(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/read")
-async def read_file(path: str = Query(..., description="File path relative to /config")):
+async def read_file(
+    request: Request,
+    path: str = Query(..., description="File path relative to /config"),
+    raw: bool = Query(False, description="Stream the file itself instead of JSON (supports Range requests)")
+):
     """
     Read file contents
     
+    With `raw=true` the file is streamed as-is in chunks, without loading it
+    into memory or wrapping it in JSON - use this for large files (logs,
+    big YAML). A `Range: bytes=start-end` header returns just that window.
+    
     Example:
     - `/api/files/read?path=configuration.yaml`
     - `/api/files/read?path=automations.yaml`
+    - `/api/files/read?path=home-assistant.log&raw=true`
     """
+    if raw:
+        try:
+            return await _raw_file_response(request, path)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to read file: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+    
     try:
         content = await file_manager.read_file(path)
-        return {
+        return FastJSONResponse({
             "success": True,
             "path": path,
             "content": content,
             "size": len(content)
-        }
+        })
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"File not found: {path}")
     except Exception as e:
@@ -102,6 +189,10 @@ async def append_to_file(file_data: FileAppend):
     
     **Note:** Does NOT auto-reload. Use /api/system/reload after changes.
     
+    The Git backup commit is not waited for (`git_commit: "pending"`):
+    appends arriving within half a second of each other are committed
+    together, so scripts appending to many files create one commit.
+    
     Example:
     ```json
     {
@@ -111,17 +202,12 @@ async def append_to_file(file_data: FileAppend):
     ```
     """
     try:
-        result = await file_manager.append_file(file_data.path, file_data.content, file_data.commit_message)
+        result = await file_manager.append_file(file_data.path, file_data.content, file_data.commit_message,
+                                                defer_commit=True)
         
-        # Auto-commit (use custom message if provided, otherwise default)
-        if git_manager.git_versioning_auto:
-            commit_msg = file_data.commit_message or f"Append to file: {file_data.path}"
-            commit = await git_manager.commit_changes(
-                commit_msg,
-                skip_if_processing=True
-            )
-            if commit:
-                result['git_commit'] = commit
+        # Commit is scheduled by file_manager.append_file() if git_versioning_auto is enabled
+        if result.get('commit'):
+            result['git_commit'] = result['commit']
         
         logger.info(f"Content appended to: {file_data.path}. Remember to reload components if needed!")
         
@@ -155,11 +241,11 @@ async def parse_yaml(path: str = Query(..., description="YAML file path")):
     """
     try:
         data = await file_manager.parse_yaml(path)
-        return {
+        return FastJSONResponse({
             "success": True,
             "path": path,
             "data": data
-        }
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid YAML: {e}")
     except FileNotFoundError:
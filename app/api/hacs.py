@@ -1,23 +1,155 @@
 """HACS API endpoints"""
 from fastapi import APIRouter, HTTPException, Depends
+import asyncio
 import logging
+import aiofiles
 import aiohttp
 import zipfile
-import io
 import os
+import re
+import shutil
+import tempfile
+from anyio import to_thread
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from app.models.schemas import Response
 from app.services.ha_client import ha_client
 from app.services.ha_websocket import get_ws_client
 from app.auth import verify_token
+from app.utils.cache import async_ttl_cache
+from app.utils.responses import FastJSONResponse, json_loads, ndjson_response
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 logger = logging.getLogger('ha_cursor_agent')
 
 HACS_GITHUB_REPO = "hacs/integration"
 HACS_INSTALL_PATH = "/config/custom_components/hacs"
+# Redirects to the latest release asset - no API call / rate limit needed
+HACS_DOWNLOAD_URL = f"https://github.com/{HACS_GITHUB_REPO}/releases/latest/download/hacs.zip"
+
+# Release tag in the redirect target: .../releases/download/<tag>/hacs.zip
+_RELEASE_TAG_RE = re.compile(r'/releases/download/([^/]+)/')
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_SPOOL_SIZE = 2 * 1024 * 1024
+ZIP_COPY_BUFFER = 1024 * 1024
+
+# Shared session for GitHub downloads, created on first use
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """HTTP session shared by HACS downloads, so connections are kept alive between requests"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300))
+    return _session
+
+
+@async_ttl_cache(ttl=5.0)
+async def _get_hacs_sensors() -> Tuple[List[dict], Dict[str, List[dict]]]:
+    """
+    HACS repository sensors (sensor.hacs_*) from the current HA states
+    
+    Filtered once per refresh instead of scanning every entity on each
+    request. Cleared after install/update, which change these sensors.
+    
+    Returns:
+        (sensors, sensors by category)
+    """
+    ws_client = await get_ws_client()
+    states = await ws_client.get_states()
+    sensors = [s for s in states if (s.get('entity_id') or '').startswith('sensor.hacs_')]
+    by_category: Dict[str, List[dict]] = {}
+    for sensor in sensors:
+        by_category.setdefault((sensor.get('attributes') or {}).get('category', ''), []).append(sensor)
+    return sensors, by_category
+
+
+def _release_tag(resp: aiohttp.ClientResponse) -> Optional[str]:
+    """Release tag from the redirect chain of a /releases/latest/download request"""
+    for url in [str(r.headers.get('Location', '')) for r in resp.history] + [str(resp.url)]:
+        match = _RELEASE_TAG_RE.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+async def close_session():
+    """Close the shared HTTP session (on shutdown)"""
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+def _extract_zip(fileobj: BinaryIO, destination: str):
+    """
+    Extract a ZIP archive into destination (blocking)
+    
+    Copies each member straight to its file instead of going through
+    ZipFile.extractall, which the release archive doesn't need (no
+    passwords, no permissions to restore). Members that would land
+    outside destination are rejected.
+    """
+    root = os.path.realpath(destination)
+    os.makedirs(root, exist_ok=True)
+    made_dirs = {root}
+    with zipfile.ZipFile(fileobj) as zip_file:
+        for info in zip_file.infolist():
+            target = os.path.realpath(os.path.join(root, info.filename.lstrip('/\\')))
+            if target != root and not target.startswith(root + os.sep):
+                raise ValueError(f"Unsafe path in archive: {info.filename}")
+            if info.is_dir():
+                if target not in made_dirs:
+                    os.makedirs(target, exist_ok=True)
+                    made_dirs.add(target)
+                continue
+            parent = os.path.dirname(target)
+            if parent not in made_dirs:
+                os.makedirs(parent, exist_ok=True)
+                made_dirs.add(parent)
+            if info.file_size == 0:
+                open(target, 'wb').close()
+                continue
+            size = min(info.file_size, ZIP_COPY_BUFFER)
+            with zip_file.open(info) as src, open(target, 'wb', buffering=size) as dst:
+                shutil.copyfileobj(src, dst, size)
+
+
+def _list_prefixed(directory: str, prefix: str) -> List[str]:
+    """Paths of entries in directory whose name starts with prefix (blocking, one scandir pass)"""
+    try:
+        with os.scandir(directory) as it:
+            return [entry.path for entry in it if entry.name.startswith(prefix)]
+    except FileNotFoundError:
+        return []
+
+
+async def _remove_paths(paths: List[str]):
+    """
+    Delete files/directory trees with a single `rm -rf`
+    
+    Falls back to shutil in a worker thread if rm is unavailable or fails.
+    """
+    if shutil.which('rm'):
+        proc = await asyncio.create_subprocess_exec(
+            'rm', '-rf', '--', *paths,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode == 0:
+            return
+        logger.warning(f"rm -rf failed ({stderr.decode(errors='replace').strip()}), falling back to shutil")
+    
+    def _remove():
+        for path in paths:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            elif os.path.lexists(path):
+                os.unlink(path)
+    
+    await to_thread.run_sync(_remove)
 
 
 @router.post("/install", response_model=Response, dependencies=[Depends(verify_token)])
@@ -45,43 +177,30 @@ async def install_hacs():
                 data={"version": "unknown", "path": HACS_INSTALL_PATH}
             )
         
-        # Get latest HACS release from GitHub
-        logger.info(f"Fetching latest HACS release from GitHub: {HACS_GITHUB_REPO}")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"https://api.github.com/repos/{HACS_GITHUB_REPO}/releases/latest") as resp:
-                if resp.status != 200:
-                    raise HTTPException(status_code=500, detail="Failed to fetch HACS release info")
-                release_data = await resp.json()
-        
-        version = release_data.get("tag_name", "unknown")
-        download_url = None
-        
-        # Find the ZIP asset
-        for asset in release_data.get("assets", []):
-            if asset["name"] == "hacs.zip":
-                download_url = asset["browser_download_url"]
-                break
-        
-        if not download_url:
-            raise HTTPException(status_code=500, detail="HACS download URL not found")
-        
-        logger.info(f"Downloading HACS {version} from {download_url}")
-        
         # Download HACS ZIP
-        async with aiohttp.ClientSession() as session:
-            async with session.get(download_url) as resp:
+        # The latest-release download URL redirects straight to the asset, so
+        # no separate release metadata request is needed. Streamed into a
+        # spooled temp file (spills to disk past 2 MiB) instead of reading
+        # the whole archive into memory
+        logger.info(f"Downloading latest HACS release from {HACS_DOWNLOAD_URL}")
+        session = get_session()
+        with tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_SIZE) as zip_tmp:
+            async with session.get(HACS_DOWNLOAD_URL) as resp:
                 if resp.status != 200:
                     raise HTTPException(status_code=500, detail="Failed to download HACS")
-                zip_content = await resp.read()
-        
-        logger.info(f"Downloaded {len(zip_content)} bytes")
-        
-        # Extract ZIP to custom_components/hacs
-        logger.info(f"Extracting HACS to {HACS_INSTALL_PATH}")
-        os.makedirs(HACS_INSTALL_PATH, exist_ok=True)
+                version = _release_tag(resp)
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    zip_tmp.write(chunk)
+            
+            logger.info(f"Downloaded {zip_tmp.tell()} bytes")
+            zip_tmp.seek(0)
+            
+            # Extract ZIP to custom_components/hacs (in a worker thread - it's blocking file I/O)
+            logger.info(f"Extracting HACS to {HACS_INSTALL_PATH}")
+            await to_thread.run_sync(_extract_zip, zip_tmp, HACS_INSTALL_PATH)
         
-        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
-            zip_file.extractall(HACS_INSTALL_PATH)
+        if not version:
+            version = await _manifest_version(Path(HACS_INSTALL_PATH) / "manifest.json")
         
         logger.info("HACS extracted successfully")
         
@@ -134,17 +253,14 @@ async def uninstall_hacs():
         
         # Remove HACS directory
         logger.info(f"Removing HACS directory: {HACS_INSTALL_PATH}")
-        import shutil
-        shutil.rmtree(HACS_INSTALL_PATH)
+        await _remove_paths([HACS_INSTALL_PATH])
         logger.info("HACS directory removed")
         
         # Remove HACS storage files
-        storage_path = Path("/config/.storage")
-        if storage_path.exists():
-            hacs_storage_files = list(storage_path.glob("hacs*"))
-            for file in hacs_storage_files:
-                logger.info(f"Removing HACS storage file: {file}")
-                file.unlink()
+        hacs_storage_files = await to_thread.run_sync(_list_prefixed, "/config/.storage", "hacs")
+        if hacs_storage_files:
+            logger.info(f"Removing HACS storage files: {', '.join(hacs_storage_files)}")
+            await _remove_paths(hacs_storage_files)
         
         logger.info("HACS uninstalled successfully")
         
@@ -169,6 +285,30 @@ async def uninstall_hacs():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ((mtime_ns, size) of manifest.json, version) - re-read only when the file changes
+_MANIFEST_CACHE: Tuple[Optional[Tuple[int, int]], str] = (None, "unknown")
+
+
+async def _manifest_version(manifest_path: Path) -> str:
+    """
+    Version from HACS manifest.json ("unknown" if missing), parsed once per file version
+    
+    Only a stat() runs on the cached path; the file itself is read with
+    aiofiles so a re-read doesn't block the event loop.
+    """
+    global _MANIFEST_CACHE
+    try:
+        st = manifest_path.stat()
+    except FileNotFoundError:
+        return "unknown"
+    key = (st.st_mtime_ns, st.st_size)
+    if _MANIFEST_CACHE[0] != key:
+        async with aiofiles.open(manifest_path, 'rb') as f:
+            data = await f.read()
+        _MANIFEST_CACHE = (key, json_loads(data).get("version", "unknown"))
+    return _MANIFEST_CACHE[1]
+
+
 @router.get("/status", response_model=Response, dependencies=[Depends(verify_token)])
 async def get_hacs_status():
     """
@@ -188,14 +328,7 @@ async def get_hacs_status():
             )
         
         # Try to read version from manifest
-        manifest_path = hacs_path / "manifest.json"
-        version = "unknown"
-        
-        if manifest_path.exists():
-            import json
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-                version = manifest.get("version", "unknown")
+        version = await _manifest_version(hacs_path / "manifest.json")
         
         return Response(
             success=True,
@@ -212,13 +345,123 @@ async def get_hacs_status():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ((mtime_ns, size) of hacs.repositories, repositories, (repo_id, repo_info) by category)
+_STORAGE_CACHE: Tuple[Optional[Tuple[int, int]], Dict[str, dict], Dict[str, List[Tuple[str, dict]]]] = (None, {}, {})
+
+
+def _load_repository_storage(storage_path: Path) -> Tuple[Dict[str, dict], Dict[str, List[Tuple[str, dict]]]]:
+    """
+    Repositories from the HACS storage file, parsed and indexed once per file version
+    
+    Returns:
+        (repositories by id, (repo_id, repo_info) pairs by category)
+    """
+    global _STORAGE_CACHE
+    st = storage_path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    if _STORAGE_CACHE[0] == key:
+        return _STORAGE_CACHE[1], _STORAGE_CACHE[2]
+    
+    storage_data = json_loads(storage_path.read_bytes())
+    
+    # Log file structure for debugging
+    logger.debug(f"HACS storage file keys: {list(storage_data.keys())}")
+    
+    # HACS stores data in 'data' object directly (not 'data' -> 'repositories')
+    # The 'data' key contains a dictionary where keys are repository IDs
+    repositories_data = storage_data.get('data', {})
+    
+    # If 'data' is empty, try alternative structures
+    if not repositories_data:
+        # Try 'data' -> 'repositories' structure (older format)
+        repositories_data = storage_data.get('data', {}).get('repositories', {})
+        logger.debug(f"Trying 'data.repositories' structure, found {len(repositories_data)} entries")
+    
+    # If still empty, try direct 'repositories' key
+    if not repositories_data:
+        repositories_data = storage_data.get('repositories', {})
+        logger.debug(f"Trying direct 'repositories' key, found {len(repositories_data)} entries")
+    
+    logger.info(f"HACS storage file contains {len(repositories_data)} repository entries")
+    
+    by_category: Dict[str, List[Tuple[str, dict]]] = {}
+    for item in repositories_data.items():
+        by_category.setdefault(item[1].get('category', ''), []).append(item)
+    
+    _STORAGE_CACHE = (key, repositories_data, by_category)
+    return repositories_data, by_category
+
+
+def _storage_repository_rows(entries: Iterable[Tuple[str, dict]]) -> Iterator[dict]:
+    """Result rows for (repo_id, repo_info) HACS storage entries"""
+    for repo_id, repo_info in entries:
+        get = repo_info.get
+        repo_category = get('category', '')
+        
+        # Determine if repository is installed
+        # HACS uses 'installed' boolean and 'version_installed' (not 'installed_version')
+        installed = get('installed', False) or get('version_installed') is not None
+        
+        # Extract name from full_name if name is not available
+        repo_name = get('name', '')
+        if not repo_name:
+            full_name = get('full_name', '')
+            repo_name = full_name.split('/')[-1] if '/' in full_name else full_name
+        
+        yield {
+            'repository_id': repo_id,
+            'full_name': get('full_name', ''),
+            'name': repo_name,
+            'category': repo_category,
+            'installed': installed,
+            'available_version': get('available_version') or get('version_available'),
+            'installed_version': get('installed_version') or get('version_installed'),
+            'description': get('description', ''),
+            'stars': get('stars', 0) or get('stargazers_count', 0),
+            'downloads': get('downloads', 0),
+        }
+
+
+def _matching_sensor_rows(sensors: List[dict], query: str) -> Iterator[dict]:
+    """Result rows for HACS sensors matching a search query"""
+    query_lower = query.lower()
+    
+    for state in sensors:
+        entity_id = state['entity_id']
+        
+        attributes = state.get('attributes') or {}
+        get = attributes.get
+        repo_category = get('category', '')
+        repo_name = get('friendly_name', '')
+        repo_id = get('repository', '')
+        repo_description = get('description', '')
+        
+        # Search in name, repository, or description (lowered once;
+        # the NUL separators stop matches spanning two fields)
+        haystack = f"{repo_name}\0{repo_id}\0{repo_description}".lower()
+        if query_lower in haystack:
+            yield {
+                'entity_id': entity_id,
+                'name': repo_name,
+                'repository': repo_id,
+                'category': repo_category,
+                'description': repo_description,
+                'installed': get('installed', False),
+                'available_version': get('available_version'),
+                'installed_version': get('installed_version'),
+                'stars': get('stars', 0),
+                'authors': get('authors', []),
+            }
+
+
 @router.get("/repositories", response_model=Response, dependencies=[Depends(verify_token)])
-async def list_hacs_repositories(category: Optional[str] = None):
+async def list_hacs_repositories(category: Optional[str] = None, stream: bool = False):
     """
     List HACS repositories by reading storage file
     
     **Parameters:**
     - category: Filter by category (integration, plugin, theme, appdaemon, netdaemon, python_script)
+    - stream: Return application/x-ndjson - a meta line, then one repository per line (default: False)
     
     **Note:** Requires HACS to be installed and configured via UI first.
     HACS stores repository data in /config/.storage/hacs.repositories
@@ -236,64 +479,12 @@ async def list_hacs_repositories(category: Optional[str] = None):
         
         # Try to read HACS storage file
         hacs_storage_path = Path("/config/.storage/hacs.repositories")
-        hacs_repos = []
+        repositories_data, by_category = {}, {}
         
         if hacs_storage_path.exists():
             try:
                 import json
-                with open(hacs_storage_path, 'r', encoding='utf-8') as f:
-                    storage_data = json.load(f)
-                
-                # Log file structure for debugging
-                logger.debug(f"HACS storage file keys: {list(storage_data.keys())}")
-                
-                # HACS stores data in 'data' object directly (not 'data' -> 'repositories')
-                # The 'data' key contains a dictionary where keys are repository IDs
-                repositories_data = storage_data.get('data', {})
-                
-                # If 'data' is empty, try alternative structures
-                if not repositories_data:
-                    # Try 'data' -> 'repositories' structure (older format)
-                    repositories_data = storage_data.get('data', {}).get('repositories', {})
-                    logger.debug(f"Trying 'data.repositories' structure, found {len(repositories_data)} entries")
-                
-                # If still empty, try direct 'repositories' key
-                if not repositories_data:
-                    repositories_data = storage_data.get('repositories', {})
-                    logger.debug(f"Trying direct 'repositories' key, found {len(repositories_data)} entries")
-                
-                logger.info(f"HACS storage file contains {len(repositories_data)} repository entries")
-                
-                for repo_id, repo_info in repositories_data.items():
-                    repo_category = repo_info.get('category', '')
-                    
-                    # Filter by category if specified
-                    if category is None or repo_category == category:
-                        # Determine if repository is installed
-                        # HACS uses 'installed' boolean and 'version_installed' (not 'installed_version')
-                        installed = repo_info.get('installed', False) or repo_info.get('version_installed') is not None
-                        
-                        # Extract name from full_name if name is not available
-                        repo_name = repo_info.get('name', '')
-                        if not repo_name:
-                            full_name = repo_info.get('full_name', '')
-                            repo_name = full_name.split('/')[-1] if '/' in full_name else full_name
-                        
-                        hacs_repos.append({
-                            'repository_id': repo_id,
-                            'full_name': repo_info.get('full_name', ''),
-                            'name': repo_name,
-                            'category': repo_category,
-                            'installed': installed,
-                            'available_version': repo_info.get('available_version') or repo_info.get('version_available'),
-                            'installed_version': repo_info.get('installed_version') or repo_info.get('version_installed'),
-                            'description': repo_info.get('description', ''),
-                            'stars': repo_info.get('stars', 0) or repo_info.get('stargazers_count', 0),
-                            'downloads': repo_info.get('downloads', 0),
-                        })
-                
-                logger.info(f"Found {len(hacs_repos)} HACS repositories from storage file")
-                
+                repositories_data, by_category = _load_repository_storage(hacs_storage_path)
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse HACS storage file: {e}")
                 raise HTTPException(status_code=500, detail=f"Failed to parse HACS storage file: {str(e)}")
@@ -301,15 +492,18 @@ async def list_hacs_repositories(category: Optional[str] = None):
                 logger.error(f"Error reading HACS storage file: {e}")
                 raise HTTPException(status_code=500, detail=f"Error reading HACS storage file: {str(e)}")
         else:
+            # No storage file yet (HACS not configured in the UI) - nothing to list
             logger.warning(f"HACS storage file not found at {hacs_storage_path}")
-            # Fallback: try to get installed integrations via API
-            try:
-                ws_client = await get_ws_client()
-                # Try to get integrations list via WebSocket
-                # Note: This will only show installed integrations, not all available repositories
-                logger.info("HACS storage file not found, trying alternative method...")
-            except Exception as e:
-                logger.error(f"Failed to get HACS repositories: {e}")
+        
+        if category is not None:
+            rows = _storage_repository_rows(by_category.get(category, []))
+        else:
+            rows = _storage_repository_rows(repositories_data.items())
+        if stream:
+            return ndjson_response({'category': category or 'all'}, rows)
+        
+        hacs_repos = list(rows)
+        logger.info(f"Found {len(hacs_repos)} HACS repositories from storage file")
         
         return Response(
             success=True,
@@ -369,10 +563,10 @@ async def install_hacs_repository(repository: str, category: str = "integration"
         )
         
         logger.info(f"WebSocket service call result: {result}")
+        _get_hacs_sensors.cache_clear()
         
         # Verify installation by checking repository status
         # Wait a moment for HACS to update its storage
-        import asyncio
         await asyncio.sleep(1)
         
         # Check if repository is now installed by reading storage file
@@ -449,13 +643,14 @@ async def install_hacs_repository(repository: str, category: str = "integration"
 
 
 @router.get("/search", response_model=Response, dependencies=[Depends(verify_token)])
-async def search_hacs_repositories(query: str, category: Optional[str] = None):
+async def search_hacs_repositories(query: str, category: Optional[str] = None, stream: bool = False):
     """
     Search HACS repositories via WebSocket
     
     **Parameters:**
     - query: Search query (repository name, author, description)
     - category: Filter by category (optional)
+    - stream: Return application/x-ndjson - a meta line, then one repository per line (default: False)
     
     **Returns:**
     Matching repositories with details
@@ -463,48 +658,16 @@ async def search_hacs_repositories(query: str, category: Optional[str] = None):
     try:
         logger.info(f"Searching HACS repositories: '{query}' (category: {category or 'all'})")
         
-        # Get WebSocket client
-        ws_client = await get_ws_client()
-        
-        # Get all states
-        states = await ws_client.get_states()
-        
-        # Search in HACS sensors
-        matching_repos = []
-        query_lower = query.lower()
+        # Get HACS sensors
+        sensors, by_category = await _get_hacs_sensors()
+        if category:
+            sensors = by_category.get(category, [])
         
-        for state in states:
-            entity_id = state.get('entity_id', '')
-            
-            if entity_id.startswith('sensor.hacs_'):
-                attributes = state.get('attributes', {})
-                repo_category = attributes.get('category', '')
-                repo_name = attributes.get('friendly_name', '')
-                repo_id = attributes.get('repository', '')
-                repo_description = attributes.get('description', '')
-                
-                # Filter by category
-                if category and repo_category != category:
-                    continue
-                
-                # Search in name, repository, or description
-                if (query_lower in repo_name.lower() or 
-                    query_lower in repo_id.lower() or 
-                    query_lower in repo_description.lower()):
-                    
-                    matching_repos.append({
-                        'entity_id': entity_id,
-                        'name': repo_name,
-                        'repository': repo_id,
-                        'category': repo_category,
-                        'description': repo_description,
-                        'installed': attributes.get('installed', False),
-                        'available_version': attributes.get('available_version'),
-                        'installed_version': attributes.get('installed_version'),
-                        'stars': attributes.get('stars', 0),
-                        'authors': attributes.get('authors', []),
-                    })
+        rows = _matching_sensor_rows(sensors, query)
+        if stream:
+            return ndjson_response({'query': query, 'category': category or 'all'}, rows)
         
+        matching_repos = list(rows)
         logger.info(f"Found {len(matching_repos)} matching repositories")
         
         return Response(
@@ -571,6 +734,7 @@ async def update_all_hacs():
         )
         
         logger.info(f"WebSocket service call result: {result}")
+        _get_hacs_sensors.cache_clear()
         logger.info("✅ HACS update initiated for all repositories")
         
         return Response(
@@ -610,42 +774,38 @@ async def get_hacs_repository_details(repository_id: str):
     try:
         logger.info(f"Getting HACS repository details: {repository_id}")
         
-        # Get WebSocket client
-        ws_client = await get_ws_client()
-        
-        # Get all states
-        states = await ws_client.get_states()
+        # Get HACS sensors
+        sensors, _ = await _get_hacs_sensors()
         
         # Find matching repository
-        for state in states:
-            entity_id = state.get('entity_id', '')
+        for state in sensors:
+            entity_id = state['entity_id']
             
-            if entity_id.startswith('sensor.hacs_'):
-                attributes = state.get('attributes', {})
-                repo = attributes.get('repository', '')
-                
-                # Match by repository name or entity_id
-                if repository_id in entity_id or repository_id in repo:
-                    return Response(
-                        success=True,
-                        message=f"Repository details: {repo}",
-                        data={
-                            'entity_id': entity_id,
-                            'repository': repo,
-                            'name': attributes.get('friendly_name', ''),
-                            'category': attributes.get('category', ''),
-                            'description': attributes.get('description', ''),
-                            'installed': attributes.get('installed', False),
-                            'available_version': attributes.get('available_version'),
-                            'installed_version': attributes.get('installed_version'),
-                            'stars': attributes.get('stars', 0),
-                            'authors': attributes.get('authors', []),
-                            'downloads': attributes.get('downloads', 0),
-                            'last_updated': attributes.get('last_updated'),
-                            'topics': attributes.get('topics', []),
-                            'state': state.get('state'),
-                        }
-                    )
+            attributes = state.get('attributes') or {}
+            repo = attributes.get('repository', '')
+            
+            # Match by repository name or entity_id
+            if repository_id in entity_id or repository_id in repo:
+                return Response(
+                    success=True,
+                    message=f"Repository details: {repo}",
+                    data={
+                        'entity_id': entity_id,
+                        'repository': repo,
+                        'name': attributes.get('friendly_name', ''),
+                        'category': attributes.get('category', ''),
+                        'description': attributes.get('description', ''),
+                        'installed': attributes.get('installed', False),
+                        'available_version': attributes.get('available_version'),
+                        'installed_version': attributes.get('installed_version'),
+                        'stars': attributes.get('stars', 0),
+                        'authors': attributes.get('authors', []),
+                        'downloads': attributes.get('downloads', 0),
+                        'last_updated': attributes.get('last_updated'),
+                        'topics': attributes.get('topics', []),
+                        'state': state.get('state'),
+                    }
+                )
         
         # Not found
         raise HTTPException(
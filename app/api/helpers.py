@@ -24,6 +24,9 @@ HELPER_FILES = {
     'input_select': '/config/input_select.yaml'
 }
 
+# Entity ID prefixes of helper entities, for str.startswith
+_HELPER_PREFIXES = tuple(f"{domain}." for domain in HELPER_FILES)
+
 
 def _load_helper_file(domain: str) -> Dict[str, Any]:
     """Load helper file for specific domain"""
@@ -141,11 +144,7 @@ async def list_helpers():
         all_states = await ha_client.get_states()
         
         # Filter helper entities
-        helper_domains = ['input_boolean', 'input_text', 'input_number', 'input_datetime', 'input_select']
-        helpers = [
-            entity for entity in all_states 
-            if any(entity['entity_id'].startswith(f"{domain}.") for domain in helper_domains)
-        ]
+        helpers = [entity for entity in all_states if entity['entity_id'].startswith(_HELPER_PREFIXES)]
         
         logger.info(f"Listed {len(helpers)} helpers")
         
@@ -14,8 +14,11 @@ from fastapi.responses import JSONResponse, HTMLResponse
 
 from app.api import files, entities, helpers, automations, scripts, system, backup, logs, logbook, ai_instructions, hacs, addons, lovelace, themes, registries
 from app.utils.logger import setup_logger
+from app.utils.compression import PathGZipMiddleware
 from app.ingress_panel import generate_ingress_html
 from app.services import ha_websocket
+from app.services.ha_client import ha_client
+from app.services.git_manager import git_manager
 from app.auth import verify_token, set_api_key, security
 
 # Setup logging
@@ -43,6 +46,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON/text responses (automation lists, AI instructions)
+app.add_middleware(PathGZipMiddleware, prefixes=("/api/automations/", "/api/ai/"))
+
 # Track MCP client versions (to avoid logging on every request)
 mcp_clients_logged = set()
 
@@ -166,11 +172,15 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop WebSocket client on shutdown"""
+    """Stop WebSocket client and close HTTP sessions on shutdown"""
     if ha_websocket.ha_ws_client:
         logger.info("Stopping WebSocket client...")
         await ha_websocket.ha_ws_client.stop()
         logger.info("✅ WebSocket client stopped")
+    await ha_client.close()
+    await hacs.close_session()
+    # Don't lose appends whose coalesced commit hasn't run yet
+    await git_manager.flush_scheduled_commit()
 
 
 
@@ -1,18 +1,65 @@
 """File management service"""
 import os
+import re
+import fnmatch
+import mmap
+import tempfile
 import aiofiles
+from anyio import to_thread
 import yaml
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, TextIO
 import logging
 
+from app.utils.cache import LRUDict
+
+try:
+    # libyaml-backed loader, much faster on large files
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 logger = logging.getLogger('ha_cursor_agent')
 
+# YAML larger than this is parsed in a worker thread
+PARSE_IN_THREAD_SIZE = 16 * 1024
+
+# Files at least this large are decoded straight from a memory map
+MMAP_READ_SIZE = 1024 * 1024
+
+# Process umask, read once at import (os.umask can only be read by setting it).
+# New files written via a private temp file get the mode open() would give them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _read_text(path: Path) -> str:
+    """
+    Read a UTF-8 text file in one go (blocking - run in a worker thread)
+    
+    One read and one decode instead of TextIOWrapper's chunked decoding.
+    Large files are decoded directly from a memory map, so no intermediate
+    bytes copy of the whole file is made. Newlines are translated like
+    text mode does (\r\n and \r become \n).
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_READ_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, 'utf-8')
+        else:
+            content = f.read().decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
 class FileManager:
     """Manages Home Assistant configuration files"""
     
     def __init__(self):
         self.config_path = Path(os.getenv('CONFIG_PATH', '/config'))
+        # (path, mtime_ns, size) -> parsed YAML
+        self._yaml_cache = LRUDict(maxsize=32)
     
     def _get_full_path(self, relative_path: str) -> Path:
         """Get full path from relative path"""
@@ -32,31 +79,74 @@ class FileManager:
         
         return full_path
     
+    def resolve(self, relative_path: str) -> Path:
+        """Absolute path for a path relative to the config directory"""
+        return self._get_full_path(relative_path)
+    
     async def list_files(self, directory: str = "", pattern: str = "*") -> List[Dict]:
-        """List files in directory"""
+        """List files in directory (recursively) whose name matches pattern"""
         try:
             dir_path = self._get_full_path(directory)
             
             if not dir_path.exists():
                 return []
             
-            files = []
-            for item in dir_path.rglob(pattern):
-                if item.is_file():
-                    rel_path = item.relative_to(self.config_path)
-                    files.append({
-                        "path": str(rel_path),
-                        "name": item.name,
-                        "size": item.stat().st_size,
-                        "modified": item.stat().st_mtime,
-                        "is_yaml": item.suffix in ['.yaml', '.yml']
-                    })
-            
-            return sorted(files, key=lambda x: x['path'])
+            if '/' in pattern:
+                # Patterns with path segments need pathlib's matching
+                return await to_thread.run_sync(self._list_files_rglob, dir_path, pattern)
+            return await to_thread.run_sync(self._list_files_scandir, dir_path, pattern)
         except Exception as e:
             logger.error(f"Error listing files: {e}")
             raise
     
+    def _file_info(self, path: str, name: str, st: os.stat_result) -> Dict:
+        """list_files entry for a file"""
+        return {
+            "path": os.path.relpath(path, self.config_path),
+            "name": name,
+            "size": st.st_size,
+            "modified": st.st_mtime,
+            "is_yaml": os.path.splitext(name)[1] in ('.yaml', '.yml')
+        }
+    
+    def _list_files_scandir(self, dir_path: Path, pattern: str) -> List[Dict]:
+        """
+        Walk dir_path with os.scandir, matching names against pattern
+        
+        Same results as Path.rglob(pattern) for a plain name pattern, but the
+        pattern is compiled once and each file costs one stat (the DirEntry
+        type comes from readdir). Symlinked directories are not followed.
+        """
+        match = re.compile(fnmatch.translate(pattern)).match
+        files = []
+        stack = [str(dir_path)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    entries = list(it)
+            except PermissionError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif match(entry.name) and entry.is_file():
+                        files.append(self._file_info(entry.path, entry.name, entry.stat()))
+                except OSError:
+                    # Vanished or unreadable entry
+                    continue
+        files.sort(key=lambda x: x['path'])
+        return files
+    
+    def _list_files_rglob(self, dir_path: Path, pattern: str) -> List[Dict]:
+        """list_files for patterns containing '/'"""
+        files = []
+        for item in dir_path.rglob(pattern):
+            if item.is_file():
+                files.append(self._file_info(str(item), item.name, item.stat()))
+        files.sort(key=lambda x: x['path'])
+        return files
+    
     async def read_file(self, file_path: str, suppress_not_found_logging: bool = False) -> str:
         """Read file contents
         
@@ -70,8 +160,7 @@ class FileManager:
             if not full_path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            async with aiofiles.open(full_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
+            content = await to_thread.run_sync(_read_text, full_path)
             
             logger.info(f"Read file: {file_path} ({len(content)} bytes)")
             return content
@@ -94,6 +183,22 @@ class FileManager:
             create_backup: Whether to create backup before writing
             commit_message: Optional custom commit message for Git backup
         """
+        return await self.write_file_stream(file_path, lambda f: f.write(content), create_backup, commit_message)
+    
+    async def write_file_stream(self, file_path: str, writer: Callable[[TextIO], None], create_backup: bool = True, commit_message: Optional[str] = None) -> Dict:
+        """Write file contents through a writer callback
+        
+        writer(fp) writes straight into a temporary file next to the target,
+        which then atomically replaces it - no full in-memory copy of the
+        content is built, and readers never see a half-written file.
+        The writer runs in a worker thread.
+        
+        Args:
+            file_path: Relative path to file
+            writer: Called with a text file object opened for writing
+            create_backup: Whether to create backup before writing
+            commit_message: Optional custom commit message for Git backup
+        """
         try:
             from app.services.git_manager import git_manager
             full_path = self._get_full_path(file_path)
@@ -110,14 +215,32 @@ class FileManager:
             # Create parent directories if needed
             full_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write file
-            async with aiofiles.open(full_path, 'w', encoding='utf-8') as f:
-                await f.write(content)
+            # Replace the real file if the path is a symlink, keeping its permissions
+            target = Path(os.path.realpath(full_path))
+            
+            def _write() -> int:
+                # Unique temp name, so overlapping writes to one file don't share it
+                fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix='.tmp')
+                tmp_path = Path(tmp_name)
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        writer(f)
+                    try:
+                        mode = target.stat().st_mode & 0o7777
+                    except FileNotFoundError:
+                        mode = 0o666 & ~_UMASK
+                    os.chmod(tmp_path, mode)
+                    os.replace(tmp_path, target)
+                except BaseException:
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+                return target.stat().st_size
             
-            logger.info(f"Wrote file: {file_path} ({len(content)} bytes)")
+            # Serializing/writing large files is blocking work - keep it off the event loop
+            size = await to_thread.run_sync(_write)
+            logger.info(f"Wrote file: {file_path} ({size} bytes)")
             
             # Commit changes after writing (if git enabled and auto mode is on)
-            # Use custom commit_message if provided, otherwise default
             commit_hash = None
             if git_manager.git_versioning_auto:
                 commit_msg = commit_message or f"Write file: {file_path}"
@@ -129,7 +252,7 @@ class FileManager:
             return {
                 "success": True,
                 "path": file_path,
-                "size": len(content),
+                "size": size,
                 "backup": backup_path,
                 "commit": commit_hash
             }
@@ -137,40 +260,60 @@ class FileManager:
             logger.error(f"Error writing file {file_path}: {e}")
             raise
     
-    async def append_file(self, file_path: str, content: str, commit_message: Optional[str] = None) -> Dict:
+    async def append_file(self, file_path: str, content: str, commit_message: Optional[str] = None, create_backup: bool = False, defer_commit: bool = False) -> Dict:
         """Append content to file
         
+        Existing content is not read back - the new content is written in
+        append mode, on a new line if the file isn't empty.
+        
         Args:
             file_path: Relative path to file
             content: Content to append
             commit_message: Optional custom commit message for Git backup
+            create_backup: Whether to create backup before appending
+            defer_commit: Don't wait for the Git commit - schedule it so bursts
+                          of appends share one commit ("commit" is "pending")
         """
         try:
+            from app.services.git_manager import git_manager
             full_path = self._get_full_path(file_path)
             
             # Create file if doesn't exist
             if not full_path.exists():
                 full_path.parent.mkdir(parents=True, exist_ok=True)
                 full_path.touch()
+            elif create_backup:
+                await git_manager.commit_changes(
+                    f"Backup before writing {file_path}",
+                    skip_if_processing=True
+                )
             
-            # Read existing content
-            async with aiofiles.open(full_path, 'r', encoding='utf-8') as f:
-                existing = await f.read()
-            
-            # Append new content
-            new_content = existing + '\n' + content if existing else content
+            # Separate from existing content with a newline
+            separator = '\n' if full_path.stat().st_size else ''
             
-            # Write back
-            async with aiofiles.open(full_path, 'w', encoding='utf-8') as f:
-                await f.write(new_content)
+            async with aiofiles.open(full_path, 'a', encoding='utf-8') as f:
+                await f.write(separator + content)
             
             logger.info(f"Appended to file: {file_path} ({len(content)} bytes)")
             
+            commit_hash = None
+            if git_manager.git_versioning_auto:
+                commit_msg = commit_message or f"Append to file: {file_path}"
+                if defer_commit:
+                    git_manager.schedule_commit(commit_msg)
+                    commit_hash = "pending"
+                else:
+                    commit_hash = await git_manager.commit_changes(
+                        commit_msg,
+                        skip_if_processing=True
+                    )
+            
             return {
                 "success": True,
                 "path": file_path,
                 "added_bytes": len(content),
-                "total_size": len(new_content)
+                "total_size": full_path.stat().st_size,
+                "commit": commit_hash
             }
         except Exception as e:
             logger.error(f"Error appending to file {file_path}: {e}")
@@ -201,11 +344,31 @@ class FileManager:
             raise
     
     async def parse_yaml(self, file_path: str) -> Dict:
-        """Parse YAML file"""
+        """Parse YAML file
+        
+        Results are cached per file version (mtime + size), so unchanged
+        files aren't parsed again.
+        """
         try:
+            full_path = self._get_full_path(file_path)
+            cache_key = None
+            if full_path.is_file():
+                st = full_path.stat()
+                cache_key = (str(full_path), st.st_mtime_ns, st.st_size)
+                cached = self._yaml_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
             content = await self.read_file(file_path)
-            data = yaml.safe_load(content)
-            return data or {}
+            if len(content) > PARSE_IN_THREAD_SIZE:
+                data = await to_thread.run_sync(yaml.load, content, _SafeLoader)
+            else:
+                data = yaml.load(content, Loader=_SafeLoader)
+            data = data or {}
+            
+            if cache_key is not None:
+                self._yaml_cache[cache_key] = data
+            return data
         except yaml.YAMLError as e:
             logger.error(f"YAML parse error in {file_path}: {e}")
             raise ValueError(f"Invalid YAML: {e}")
@@ -1,16 +1,91 @@
 """Git versioning manager"""
 import os
+import asyncio
+import re
 import git
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Set, Tuple
 import logging
 import tempfile
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from anyio import to_thread
+
+from app.utils.cache import LRUDict
 
 logger = logging.getLogger('ha_cursor_agent')
 
+# Commit hashes (full or abbreviated) - diffs between two of them never change
+_COMMIT_HASH_RE = re.compile(r'^[0-9a-f]{7,40}$')
+
+# Threads used to copy restored files from the shadow repo into /config
+SYNC_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Blobs larger than this are stored deflated without delta search (core.bigFileThreshold)
+BIG_FILE_THRESHOLD = '1m'
+
+# Seconds of quiet before a scheduled (coalesced) commit runs
+COMMIT_DEBOUNCE = 0.5
+
+# Escapes git uses when C-style quoting a path (see quote_c_style in git's quote.c)
+_C_QUOTE_ESCAPES = {
+    b'\\': b'\\', b'"': b'"', b't': b'\t', b'n': b'\n', b'a': b'\a',
+    b'b': b'\b', b'f': b'\f', b'r': b'\r', b'v': b'\v',
+}
+_C_QUOTE_ESCAPE_RE = re.compile(rb'\\([0-7]{3}|.)', re.DOTALL)
+
+def _unquote_c_path(quoted: str) -> str:
+    """Undo git's C-style path quoting (body without the surrounding quotes)
+    
+    Works on bytes: octal escapes are raw UTF-8 bytes of the name, and
+    unescaped characters are passed through as their UTF-8 encoding.
+    """
+    def _replace(match: re.Match) -> bytes:
+        escape = match.group(1)
+        if len(escape) == 3:
+            return bytes([int(escape, 8)])
+        return _C_QUOTE_ESCAPES.get(escape, match.group(0))
+    return _C_QUOTE_ESCAPE_RE.sub(_replace, quoted.encode('utf-8')).decode('utf-8', 'replace')
+
+def build_diff_index(diff: str) -> List[Dict]:
+    """
+    Index a unified diff by file, in one pass
+    
+    Returns one entry per file:
+        {"path", "line", "added", "removed", "hunk_offsets"}
+    where line is the 0-based line of the file's "diff --git" header within
+    the patch and hunk_offsets are the 0-based lines of its "@@" hunk
+    headers, so clients can jump to a file or hunk without re-parsing.
+    """
+    files: List[Dict] = []
+    current = None
+    in_hunk = False
+    for number, line in enumerate(diff.split('\n')):
+        if line.startswith('diff --git '):
+            # Renames are disabled, so the header is "a/<path> b/<path>" with equal paths
+            paths = line[len('diff --git '):]
+            if paths.startswith('"'):
+                # C-style quoted (names with quotes, backslashes or control characters)
+                path = _unquote_c_path(paths[3:(len(paths) - 1) // 2 - 1])
+            else:
+                path = paths[2:(len(paths) - 1) // 2]
+            current = {"path": path, "line": number, "added": 0, "removed": 0, "hunk_offsets": []}
+            files.append(current)
+            in_hunk = False
+        elif current is None:
+            continue
+        elif line.startswith('@@'):
+            current["hunk_offsets"].append(number)
+            in_hunk = True
+        elif in_hunk:
+            if line.startswith('+'):
+                current["added"] += 1
+            elif line.startswith('-'):
+                current["removed"] += 1
+    return files
+
 class GitManager:
     """Manages Git versioning for config files (using a shadow Git repo)"""
     
@@ -31,6 +106,20 @@ class GitManager:
         self.repo = None
         self.processing_request = False  # Flag to disable auto-commits during request processing
         
+        # Read caches: history keyed on (HEAD sha, limit), diffs on (commit1, commit2) hashes
+        self._history_cache = LRUDict(maxsize=16)
+        self._diff_cache = LRUDict(maxsize=32)
+        # Bumped when history is rewritten, so reads started before that aren't cached
+        self._cache_generation = 0
+        # In-flight read-only git calls, shared by concurrent identical requests
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        # Held while a worker thread changes the shadow repo (commit, restore, rollback)
+        self._write_lock = asyncio.Lock()
+        
+        # Scheduled commit: (debounce timer, future with the commit hash, messages)
+        self._pending_commit: Optional[Tuple[asyncio.TimerHandle, asyncio.Future, List[str]]] = None
+        self._commit_tasks: Set[asyncio.Task] = set()
+        
         # Always initialize shadow repo (Git is always enabled)
         self._init_repo()
     
@@ -55,9 +144,23 @@ class GitManager:
                 self.repo.config_writer().set_value("user", "name", "HA Vibecode Agent").release()
                 self.repo.config_writer().set_value("user", "email", "agent@homeassistant.local").release()
                 logger.info(f"Git shadow repository initialized in {self.shadow_root}")
+            self._configure_repo()
         except Exception as e:
             logger.error(f"Failed to initialize Git: {e}")
     
+    def _configure_repo(self):
+        """Apply shadow repo settings (re-applied after cleanup replaces .git)
+        
+        Large files (images, blueprints with embedded data, etc.) are kept
+        out of delta compression so commits and gc don't spend time
+        searching for deltas in them.
+        """
+        try:
+            with self.repo.config_writer() as config:
+                config.set_value('core', 'bigFileThreshold', BIG_FILE_THRESHOLD)
+        except Exception as e:
+            logger.warning(f"Failed to configure shadow repository: {e}")
+    
     def _create_gitignore(self):
         """(Legacy) Create .gitignore file in config directory to exclude large files.
         
@@ -301,6 +404,16 @@ secrets.yaml
 
         return True
 
+    @staticmethod
+    def _same_file_stat(src: Path, dst: Path) -> bool:
+        """Check whether dst has the same size and mtime as src (False if dst is missing)"""
+        try:
+            dst_stat = dst.stat()
+        except FileNotFoundError:
+            return False
+        src_stat = src.stat()
+        return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+    
     def _sync_config_to_shadow(self):
         """Synchronize filtered files from /config into the shadow repo worktree.
         
@@ -338,9 +451,13 @@ secrets.yaml
 
                 src = source_root / rel_path_norm
                 dst = shadow_root / rel_path_norm
-                dst.parent.mkdir(parents=True, exist_ok=True)
                 try:
-                    shutil.copy2(src, dst)
+                    # copy2 keeps mtime, so same size + mtime means the shadow copy is
+                    # current. Leaving it untouched also keeps git's index stat data
+                    # valid, so status/commit don't have to re-hash the file.
+                    if not self._same_file_stat(src, dst):
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        shutil.copy2(src, dst)
                     included_paths.add(rel_path_norm.replace(os.sep, '/'))
                 except Exception as e:
                     logger.warning(f"Failed to copy {src} to shadow repo: {e}")
@@ -389,10 +506,10 @@ secrets.yaml
                 logger.warning(f"Failed to restore {rel_path_norm} to /config: {e}")
 
         if only_paths:
-            for p in only_paths:
-                _copy_single(p)
+            paths = only_paths
         else:
             # Copy all files from shadow_root (except .git) into /config
+            paths = []
             for root, dirs, files in os.walk(source_root):
                 if '.git' in dirs:
                     dirs.remove('.git')
@@ -400,8 +517,15 @@ secrets.yaml
                 if rel_root == '.':
                     rel_root = ''
                 for filename in files:
-                    rel_path = os.path.join(rel_root, filename) if rel_root else filename
-                    _copy_single(rel_path)
+                    paths.append(os.path.join(rel_root, filename) if rel_root else filename)
+
+        # Copies are I/O bound - overlap them instead of going file by file
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(paths), SYNC_WORKERS)) as pool:
+                list(pool.map(_copy_single, paths))
+        else:
+            for p in paths:
+                _copy_single(p)
 
         if delete_missing:
             # Build sets of tracked paths in shadow and in /config (filtered)
@@ -459,85 +583,164 @@ secrets.yaml
             return None
         
         try:
-            # First, synchronize filtered files from /config into the shadow repo
-            self._sync_config_to_shadow()
-
-            # Check if there are changes (only for tracked files and config files)
-            if not self.repo.is_dirty(untracked_files=True):
-                logger.debug("No changes to commit")
-                return None
-            
-            # If auto-commit is disabled and this is not a forced commit, only sync but don't commit
-            if not self.git_versioning_auto and not force:
-                logger.debug("Auto-commit disabled, changes synced to shadow repo but not committed")
-                return None
-            
-            # Add only configuration files, not all files
-            # This respects .gitignore and only adds config files
-            self._add_config_files_only()
-            
-            # Create commit message
-            if not message:
-                message = f"Auto-commit by HA Cursor Agent at {datetime.now().isoformat()}"
-            
-            # Commit
-            commit = self.repo.index.commit(message)
-            commit_hash = commit.hexsha[:8]
-            
-            logger.info(f"Committed changes: {commit_hash} - {message}")
-            
-            # Cleanup old commits if needed
-            # When we reach max_backups (50), we keep only 30 commits and continue
-            # Count commits in current branch only (not all commits in repo)
-            try:
-                # Get current branch name
-                current_branch = self.repo.active_branch.name
+            # Git work (file sync, status, add, commit, cleanup) runs in a worker thread so
+            # the event loop keeps serving requests; the lock serializes writers to the repo
+            async with self._write_lock:
+                result = await to_thread.run_sync(self._commit_sync, message, force)
+                if result is None:
+                    return None
+                commit_hash, commit_count = result
                 
-                # Use git rev-list to count only commits reachable from HEAD
-                # Use --first-parent to follow only the main branch (not merge commits)
-                # Note: --first-parent already excludes reflog-only commits, so no need for gc before counting
-                # git gc is expensive (takes ~4 minutes) and not needed here
-                rev_list_output = self.repo.git.rev_list('--count', '--first-parent', 'HEAD')
-                commit_count = int(rev_list_output.strip())
-                logger.info(f"Commit count via rev-list --first-parent HEAD ({current_branch}): {commit_count}")
-            except Exception as e:
-                # Fallback: use git log with explicit HEAD reference
-                logger.warning(f"git rev-list failed, using git log fallback: {e}")
-                try:
-                    log_output = self.repo.git.log('--oneline', '--first-parent', 'HEAD', '--max-count=100')
-                    commit_count = len([line for line in log_output.strip().split('\n') if line.strip()])
-                    logger.info(f"Commit count via git log --first-parent HEAD: {commit_count}")
-                except Exception as e2:
-                    # Last fallback: count commits using iter_commits with HEAD
-                    logger.warning(f"git log failed, using iter_commits fallback: {e2}")
-                    commit_count = len(list(self.repo.iter_commits('HEAD', max_count=1000)))
-            
-            # Always log this check (not debug) to see what's happening
-            logger.info(f"Checking cleanup: commit_count={commit_count}, max_backups={self.max_backups}, need_cleanup={commit_count >= self.max_backups}")
-            if commit_count >= self.max_backups:
-                commits_to_keep = max(10, self.max_backups - 10)
-                logger.info(f"⚠️ Cleanup triggered: commit_count ({commit_count}) >= max_backups ({self.max_backups}), will keep {commits_to_keep} commits")
-                # At max_backups, cleanup to keep only (max_backups - 10) commits
-                await self._cleanup_old_commits()
-                
-                # After cleanup, reload repository to ensure we have correct state
-                # This is critical because cleanup replaces .git directory
-                try:
-                    self.repo = git.Repo(self.repo.working_dir)
-                    # Verify cleanup worked by checking commit count again
-                    rev_list_output = self.repo.git.rev_list('--count', '--first-parent', 'HEAD')
-                    new_count = int(rev_list_output.strip())
-                    logger.info(f"After cleanup: Repository now has {new_count} commits (was {commit_count})")
-                except Exception as reload_error:
-                    logger.warning(f"Failed to reload repository after cleanup: {reload_error}")
-            else:
-                logger.debug(f"No cleanup needed: commit_count ({commit_count}) < max_backups ({self.max_backups})")
+                # Always log this check (not debug) to see what's happening
+                logger.info(f"Checking cleanup: commit_count={commit_count}, max_backups={self.max_backups}, need_cleanup={commit_count >= self.max_backups}")
+                if commit_count >= self.max_backups:
+                    commits_to_keep = max(10, self.max_backups - 10)
+                    logger.info(f"⚠️ Cleanup triggered: commit_count ({commit_count}) >= max_backups ({self.max_backups}), will keep {commits_to_keep} commits")
+                    # At max_backups, cleanup to keep only (max_backups - 10) commits
+                    try:
+                        await to_thread.run_sync(self._auto_cleanup_sync, commit_count)
+                    finally:
+                        self._clear_read_caches()
+                else:
+                    logger.debug(f"No cleanup needed: commit_count ({commit_count}) < max_backups ({self.max_backups})")
             
             return commit_hash
         except Exception as e:
             logger.error(f"Failed to commit changes: {e}")
             return None
     
+    def _auto_cleanup_sync(self, commit_count: int):
+        """Blocking cleanup after a commit reached max_backups (caller holds _write_lock)"""
+        self._cleanup_old_commits_sync()
+        
+        # After cleanup, reload repository to ensure we have correct state
+        # This is critical because cleanup replaces .git directory
+        try:
+            self.repo = git.Repo(self.repo.working_dir)
+            # Verify cleanup worked by checking commit count again
+            rev_list_output = self.repo.git.rev_list('--count', '--first-parent', 'HEAD')
+            new_count = int(rev_list_output.strip())
+            logger.info(f"After cleanup: Repository now has {new_count} commits (was {commit_count})")
+        except Exception as reload_error:
+            logger.warning(f"Failed to reload repository after cleanup: {reload_error}")
+    
+    def _commit_sync(self, message: Optional[str], force: bool) -> Optional[Tuple[str, int]]:
+        """Blocking part of commit_changes
+        
+        Returns:
+            (short commit hash, commit count on the current branch), or None
+            if nothing was committed
+        """
+        # First, synchronize filtered files from /config into the shadow repo
+        self._sync_config_to_shadow()
+
+        # Check if there are changes (only for tracked files and config files)
+        if not self.repo.is_dirty(untracked_files=True):
+            logger.debug("No changes to commit")
+            return None
+        
+        # If auto-commit is disabled and this is not a forced commit, only sync but don't commit
+        if not self.git_versioning_auto and not force:
+            logger.debug("Auto-commit disabled, changes synced to shadow repo but not committed")
+            return None
+        
+        # Add only configuration files, not all files
+        # This respects .gitignore and only adds config files
+        self._add_config_files_only()
+        
+        # Create commit message
+        if not message:
+            message = f"Auto-commit by HA Cursor Agent at {datetime.now().isoformat()}"
+        
+        # Commit
+        commit = self.repo.index.commit(message)
+        commit_hash = commit.hexsha[:8]
+        
+        logger.info(f"Committed changes: {commit_hash} - {message}")
+        
+        # Cleanup old commits if needed
+        # When we reach max_backups (50), we keep only 30 commits and continue
+        # Count commits in current branch only (not all commits in repo)
+        try:
+            # Get current branch name
+            current_branch = self.repo.active_branch.name
+            
+            # Use git rev-list to count only commits reachable from HEAD
+            # Use --first-parent to follow only the main branch (not merge commits)
+            # Note: --first-parent already excludes reflog-only commits, so no need for gc before counting
+            # git gc is expensive (takes ~4 minutes) and not needed here
+            rev_list_output = self.repo.git.rev_list('--count', '--first-parent', 'HEAD')
+            commit_count = int(rev_list_output.strip())
+            logger.info(f"Commit count via rev-list --first-parent HEAD ({current_branch}): {commit_count}")
+        except Exception as e:
+            # Fallback: use git log with explicit HEAD reference
+            logger.warning(f"git rev-list failed, using git log fallback: {e}")
+            try:
+                log_output = self.repo.git.log('--oneline', '--first-parent', 'HEAD', '--max-count=100')
+                commit_count = len([line for line in log_output.strip().split('\n') if line.strip()])
+                logger.info(f"Commit count via git log --first-parent HEAD: {commit_count}")
+            except Exception as e2:
+                # Last fallback: count commits using iter_commits with HEAD
+                logger.warning(f"git log failed, using iter_commits fallback: {e2}")
+                commit_count = len(list(self.repo.iter_commits('HEAD', max_count=1000)))
+        
+        return commit_hash, commit_count
+    
+    def schedule_commit(self, message: str, delay: float = COMMIT_DEBOUNCE) -> asyncio.Future:
+        """Commit current changes once writes go quiet
+        
+        Calls within `delay` seconds of each other are coalesced into a
+        single commit_changes() call (message lists all of them), so a burst
+        of small writes produces one commit instead of one per write.
+        
+        Returns:
+            Future resolved with the commit hash (None if nothing was
+            committed). Callers don't have to await it.
+        """
+        loop = asyncio.get_running_loop()
+        if self._pending_commit is not None:
+            handle, future, messages = self._pending_commit
+            handle.cancel()
+        else:
+            future, messages = loop.create_future(), []
+        messages.append(message)
+        handle = loop.call_later(delay, self._run_scheduled_commit)
+        self._pending_commit = (handle, future, messages)
+        return future
+    
+    def _run_scheduled_commit(self):
+        """Debounce timer expired - commit everything scheduled so far"""
+        _, future, messages = self._pending_commit
+        self._pending_commit = None
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = f"{messages[0]} (+{len(messages) - 1} more)\n\n" + '\n'.join(f"- {m}" for m in messages)
+        task = asyncio.ensure_future(self.commit_changes(message, skip_if_processing=True))
+        self._commit_tasks.add(task)
+        
+        def _done(t: asyncio.Task):
+            self._commit_tasks.discard(t)
+            if future.done():
+                return
+            if t.cancelled():
+                future.cancel()
+            elif t.exception() is not None:
+                future.set_exception(t.exception())
+            else:
+                future.set_result(t.result())
+        
+        task.add_done_callback(_done)
+    
+    async def flush_scheduled_commit(self) -> Optional[str]:
+        """Run a scheduled commit now instead of waiting for the timer (e.g. on shutdown)"""
+        if self._pending_commit is None:
+            return None
+        self._pending_commit[0].cancel()
+        future = self._pending_commit[1]
+        self._run_scheduled_commit()
+        return await future
+    
     async def create_checkpoint(self, user_request: str) -> Dict:
         """Create checkpoint with tag at the start of user request processing"""
         if not self.repo:
@@ -557,43 +760,13 @@ secrets.yaml
                 force=True
             )
             
-            # If no changes, get current HEAD
-            if not commit_hash:
-                try:
-                    commit_hash = self.repo.head.commit.hexsha[:8]
-                except:
-                    commit_hash = None
-            
             # Create tag with timestamp and description
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             tag_name = f"checkpoint_{timestamp}"
             tag_message = f"Checkpoint before: {user_request}"
             
-            # Create tag
-            if commit_hash:
-                try:
-                    # Use HEAD for tag creation (commit_hash is already committed)
-                    tag = self.repo.create_tag(
-                        tag_name,
-                        ref="HEAD",
-                        message=tag_message
-                    )
-                    logger.info(f"Created checkpoint tag: {tag_name} - {tag_message}")
-                except Exception as e:
-                    logger.warning(f"Failed to create tag (may already exist): {e}")
-                    tag = None
-            else:
-                try:
-                    # Try to create tag on HEAD even if no new commit
-                    tag = self.repo.create_tag(
-                        tag_name,
-                        ref="HEAD",
-                        message=tag_message
-                    )
-                    logger.info(f"Created checkpoint tag: {tag_name} - {tag_message}")
-                except Exception as e:
-                    logger.warning(f"Failed to create tag: {e}")
-                    tag = None
+            async with self._write_lock:
+                commit_hash = await to_thread.run_sync(self._tag_checkpoint, commit_hash, tag_name, tag_message)
             
             # Set flag to disable auto-commits during request processing
             self.processing_request = True
@@ -614,6 +787,27 @@ secrets.yaml
                 "tag": None
             }
     
+    def _tag_checkpoint(self, commit_hash: Optional[str], tag_name: str, tag_message: str) -> Optional[str]:
+        """Blocking part of create_checkpoint - tag HEAD
+        
+        Returns:
+            commit_hash, or the current HEAD if nothing was committed
+        """
+        # If no changes, get current HEAD
+        if not commit_hash:
+            try:
+                commit_hash = self.repo.head.commit.hexsha[:8]
+            except:
+                commit_hash = None
+        
+        try:
+            # Use HEAD for tag creation (commit_hash is already committed)
+            self.repo.create_tag(tag_name, ref="HEAD", message=tag_message)
+            logger.info(f"Created checkpoint tag: {tag_name} - {tag_message}")
+        except Exception as e:
+            logger.warning(f"Failed to create tag (may already exist): {e}")
+        return commit_hash
+    
     def end_request_processing(self):
         """End request processing - re-enable auto-commits"""
         self.processing_request = False
@@ -632,10 +826,11 @@ secrets.yaml
         except (FileNotFoundError, subprocess.TimeoutExpired, Exception):
             return False
     
-    async def _cleanup_old_commits(self):
+    def _cleanup_old_commits_sync(self):
         """Remove old commits to save space - keeps only (max_backups - 10) commits when reaching max_backups
         
-        This is called automatically when commits reach max_backups.
+        This is called automatically (in a worker thread, holding _write_lock)
+        when commits reach max_backups.
         We keep (max_backups - 10) commits to have buffer of 10 before next cleanup.
         For manual cleanup with backup branch deletion, use cleanup_commits().
         
@@ -688,7 +883,7 @@ secrets.yaml
                     # Ensure all current changes are committed before cleanup
                     # force=True to always commit before cleanup, regardless of auto mode
                     if self.repo.is_dirty(untracked_files=True):
-                        await self.commit_changes("Pre-cleanup commit: save current state", force=True)
+                        self._commit_sync("Pre-cleanup commit: save current state", True)
                     
                     # Use git filter-repo to keep only last N commits
                     # This is the cleanest and most reliable method
@@ -724,7 +919,7 @@ secrets.yaml
             current_branch = self.repo.active_branch.name
             
             # Use clone with depth method
-            await self._cleanup_using_clone_depth(total_commits, commits_to_keep_count, current_branch)
+            self._cleanup_using_clone_depth(total_commits, commits_to_keep_count, current_branch)
             
             # After cleanup, verify the count is correct and reload repository
             # This ensures we have the correct state for future operations
@@ -741,8 +936,8 @@ secrets.yaml
             logger.error(f"Failed to cleanup commits: {cleanup_error}")
             # Don't fail the whole operation if cleanup fails - repository is still usable
     
-    async def _cleanup_using_clone_depth(self, total_commits: int, commits_to_keep_count: int, current_branch: str):
-        """Cleanup method using git clone with depth - simpler and more reliable
+    def _cleanup_using_clone_depth(self, total_commits: int, commits_to_keep_count: int, current_branch: str):
+        """Cleanup method using git clone with depth - simpler and more reliable (blocking)
         
         This method:
         1. Clones the existing repository with depth=commits_to_keep_count
@@ -869,6 +1064,7 @@ secrets.yaml
             
             # Reload repository to get fresh state
             self.repo = git.Repo(repo_path)
+            self._configure_repo()
             
             # Run gc for final cleanup (optional but recommended)
             try:
@@ -917,6 +1113,15 @@ secrets.yaml
                 "backup_branches_deleted": 0
             }
         
+        # Rewrites the branch in a worker thread, serialized with other writers
+        async with self._write_lock:
+            try:
+                return await to_thread.run_sync(self._cleanup_commits_sync, delete_backup_branches)
+            finally:
+                self._clear_read_caches()
+    
+    def _cleanup_commits_sync(self, delete_backup_branches: bool) -> Dict:
+        """Blocking part of cleanup_commits (caller holds _write_lock)"""
         try:
             commits = list(self.repo.iter_commits())
             total_commits = len(commits)
@@ -954,7 +1159,7 @@ secrets.yaml
             # Ensure all current changes are committed before cleanup
             # force=True to always commit before cleanup, regardless of auto mode
             if self.repo.is_dirty(untracked_files=True):
-                await self.commit_changes("Pre-cleanup commit: save current state", force=True)
+                self._commit_sync("Pre-cleanup commit: save current state", True)
             
             # Get the oldest commit we want to keep (last in list is oldest)
             oldest_keep_commit = commits_to_keep[-1]
@@ -1058,26 +1263,137 @@ secrets.yaml
             logger.warning(f"Failed to delete backup branches: {e}")
             return 0
     
+    async def _run_git_readonly(self, args: List[str], timeout: int = 240) -> subprocess.CompletedProcess:
+        """Run a read-only git command in the shadow repo without blocking the event loop"""
+        return await to_thread.run_sync(lambda: subprocess.run(
+            ['git', *args],
+            cwd=str(self.repo.working_dir),
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout
+        ))
+    
+    def _head_sha(self) -> Optional[str]:
+        """Current HEAD commit hash (read from refs, no subprocess), None if there are no commits"""
+        try:
+            return self.repo.head.commit.hexsha
+        except Exception:
+            return None
+    
+    async def _single_flight(self, key: Tuple, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory() unless an identical call (same key) is already running - then share its result"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None) if self._inflight.get(key) is f else None)
+        # Shielded so one cancelled request doesn't cancel the call for the others
+        return await asyncio.shield(future)
+    
+    def _clear_read_caches(self):
+        """Forget cached history and diffs - call after rewriting history (cleanup, rollback)"""
+        self._cache_generation += 1
+        self._history_cache.clear()
+        self._diff_cache.clear()
+        self._inflight.clear()
+    
     async def get_history(self, limit: int = 20) -> List[Dict]:
-        """Get commit history"""
+        """Get commit history
+        
+        Uses a single `git log --numstat` call instead of one diff per
+        commit (commit.stats) to count changed files. Results are cached
+        until HEAD moves, and concurrent identical calls share one git log.
+        """
         if not self.repo:
             return []
         
+        cache_key = (self._head_sha(), limit)
+        if cache_key[0] is not None:
+            cached = self._history_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        return await self._single_flight(('history', *cache_key), lambda: self._load_history(cache_key, limit))
+    
+    async def _load_history(self, cache_key: Tuple[Optional[str], int], limit: int) -> List[Dict]:
+        """Run git log for get_history and cache the parsed result"""
+        generation = self._cache_generation
         try:
+            # \x1e starts a commit record, \x1f separates its fields; numstat lines follow the header
+            result = await self._run_git_readonly(
+                ['log', f'--max-count={limit}', '--no-renames', '--numstat',
+                 '--format=%x1e%H%x1f%an%x1f%ct%x1f%B%x1f'],
+                timeout=60
+            )
+            if result.returncode != 0:
+                # e.g. no commits yet
+                logger.debug(f"git log returned non-zero exit code: {result.stderr}")
+                return []
+            
             commits = []
-            for commit in self.repo.iter_commits(max_count=limit):
+            for record in result.stdout.split('\x1e')[1:]:
+                hexsha, author, committed_date, message, numstat = record.split('\x1f', 4)
                 commits.append({
-                    "hash": commit.hexsha[:8],
-                    "message": commit.message.strip(),
-                    "author": str(commit.author),
-                    "date": datetime.fromtimestamp(commit.committed_date).isoformat(),
-                    "files_changed": len(commit.stats.files)
+                    "hash": hexsha[:8],
+                    "message": message.strip(),
+                    "author": author,
+                    "date": datetime.fromtimestamp(int(committed_date)).isoformat(),
+                    "files_changed": sum(1 for line in numstat.splitlines() if line.strip())
                 })
+            if cache_key[0] is not None and generation == self._cache_generation:
+                self._history_cache[cache_key] = commits
             return commits
         except Exception as e:
             logger.error(f"Failed to get history: {e}")
             return []
     
+    def _changed_paths(self, *revisions: str) -> List[Tuple[str, str]]:
+        """List (status, path) for files that differ between revisions / the worktree
+        
+        Uses `git diff --name-status -z`, which only visits changed entries;
+        status is one of A, D, M, T (renames are reported as D + A).
+        Returns an empty list if the revision does not exist (e.g. no commits yet).
+        """
+        try:
+            output = self.repo.git.diff('--name-status', '--no-renames', '-z', *revisions)
+        except git.GitCommandError as e:
+            logger.debug(f"git diff --name-status failed: {e}")
+            return []
+        fields = output.split('\0')
+        return [(fields[i][0], fields[i + 1]) for i in range(0, len(fields) - 1, 2)]
+    
+    def _untracked_paths(self) -> List[str]:
+        """List untracked files in the shadow worktree (individual files, not directories)"""
+        output = self.repo.git.ls_files('--others', '--exclude-standard', '-z')
+        return [path for path in output.split('\0') if path]
+    
+    def _pending_changes_sync(self) -> Tuple[List[str], List[str], List[str]]:
+        """Blocking part of get_pending_changes
+        
+        Returns:
+            (modified, added, deleted) paths
+        """
+        # Sync current state from /config to shadow repo
+        self._sync_config_to_shadow()
+        
+        # Tracked changes vs HEAD (index + worktree) and untracked files, both
+        # NUL-delimited so paths with spaces or non-ASCII names come through as-is
+        files_modified = []
+        files_added = self._untracked_paths()
+        files_deleted = []
+        
+        for status, file_path in self._changed_paths('HEAD'):
+            if status == 'D':
+                files_deleted.append(file_path)
+            elif status == 'A':
+                files_added.append(file_path)
+            else:
+                # M (modified) or T (type changed)
+                files_modified.append(file_path)
+        return files_modified, files_added, files_deleted
+    
     async def get_pending_changes(self) -> Dict:
         """Get information about uncommitted changes in shadow repository
         
@@ -1105,38 +1421,9 @@ secrets.yaml
             }
         
         try:
-            # Sync current state from /config to shadow repo
-            self._sync_config_to_shadow()
-            
-            # Get status of changes
-            status_output = self.repo.git.status('--porcelain')
-            
-            files_modified = []
-            files_added = []
-            files_deleted = []
-            
-            for line in status_output.strip().split('\n'):
-                if not line.strip():
-                    continue
-                
-                # Git status format: XY filename
-                # X = status of index, Y = status of work tree
-                # M = modified, A = added, D = deleted, ?? = untracked
-                status_code = line[:2]
-                file_path = line[3:].strip()
-                
-                if status_code.startswith('??'):
-                    # Untracked file (new file)
-                    files_added.append(file_path)
-                elif 'D' in status_code:
-                    # Deleted file
-                    files_deleted.append(file_path)
-                elif 'M' in status_code or 'A' in status_code:
-                    # Modified or added
-                    if status_code[0] == 'A' or status_code[1] == 'A':
-                        files_added.append(file_path)
-                    else:
-                        files_modified.append(file_path)
+            # Sync and list changes in a worker thread, serialized with other writers
+            async with self._write_lock:
+                files_modified, files_added, files_deleted = await to_thread.run_sync(self._pending_changes_sync)
             
             has_changes = len(files_modified) > 0 or len(files_added) > 0 or len(files_deleted) > 0
             
@@ -1235,6 +1522,15 @@ secrets.yaml
         
         return message
     
+    def _reset_to_commit(self, commit_hash: str):
+        """Blocking part of rollback"""
+        # Reset shadow repo worktree to the specified commit
+        self.repo.git.reset('--hard', commit_hash)
+        
+        # Sync full state from shadow repo back into /config, removing
+        # files that are no longer present in the selected commit.
+        self._sync_shadow_to_config(only_paths=None, delete_missing=True)
+    
     async def rollback(self, commit_hash: str) -> Dict:
         """Rollback to specific commit"""
         if not self.repo:
@@ -1244,12 +1540,11 @@ secrets.yaml
             # Commit current state before rollback (force=True to always commit before rollback)
             await self.commit_changes(f"Before rollback to {commit_hash}", force=True)
             
-            # Reset shadow repo worktree to the specified commit
-            self.repo.git.reset('--hard', commit_hash)
-            
-            # Sync full state from shadow repo back into /config, removing
-            # files that are no longer present in the selected commit.
-            self._sync_shadow_to_config(only_paths=None, delete_missing=True)
+            async with self._write_lock:
+                try:
+                    await to_thread.run_sync(self._reset_to_commit, commit_hash)
+                finally:
+                    self._clear_read_caches()
             
             logger.info(f"Rolled back to commit: {commit_hash}")
             
@@ -1262,42 +1557,61 @@ secrets.yaml
             logger.error(f"Failed to rollback: {e}")
             raise Exception(f"Rollback failed: {e}")
     
-    async def get_diff(self, commit1: str = None, commit2: str = None) -> str:
-        """Get diff between commits or current changes"""
+    async def get_diff(self, commit1: str = None, commit2: str = None, name_status: bool = False) -> str:
+        """Get diff between commits or current changes
+        
+        Diffs between two commit hashes are cached (commits are immutable);
+        diffs involving HEAD or the working tree are always recomputed.
+        Concurrent identical calls share one git diff.
+        
+        Args:
+            commit1: Base commit (default: HEAD)
+            commit2: Target commit (default: HEAD if commit1 is given, else working tree)
+            name_status: Only list changed files with their status (M/A/D),
+                         without generating patches
+        """
         if not self.repo:
             return ""
         
+        cache_key = None
+        if commit1 and commit2 and _COMMIT_HASH_RE.match(commit1) and _COMMIT_HASH_RE.match(commit2):
+            cache_key = (commit1, commit2, name_status)
+            cached = self._diff_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        key = ('diff', commit1, commit2, name_status)
+        return await self._single_flight(key, lambda: self._load_diff(commit1, commit2, name_status, cache_key))
+    
+    async def _load_diff(self, commit1: Optional[str], commit2: Optional[str], name_status: bool,
+                         cache_key: Optional[Tuple[str, str, bool]]) -> str:
+        """Run git diff for get_diff and cache the result if it is between two commit hashes"""
+        generation = self._cache_generation
         try:
-            # Use subprocess with explicit working directory to avoid "Unable to read current working directory" errors
+            # Use subprocess with explicit working directory to avoid "Unable to read current working directory" errors.
+            # Rename detection is skipped - renames show as delete + add, which is
+            # fine for config backups and avoids the most expensive part of a diff.
             if commit1 and commit2:
-                result = subprocess.run(
-                    ['git', 'diff', commit1, commit2],
-                    cwd=str(self.repo.working_dir),
-                    capture_output=True,
-                    text=True,
-                    timeout=240
-                )
+                revisions = [commit1, commit2]
             elif commit1:
-                result = subprocess.run(
-                    ['git', 'diff', commit1, 'HEAD'],
-                    cwd=str(self.repo.working_dir),
-                    capture_output=True,
-                    text=True,
-                    timeout=240
-                )
+                revisions = [commit1, 'HEAD']
             else:
-                result = subprocess.run(
-                    ['git', 'diff', 'HEAD'],
-                    cwd=str(self.repo.working_dir),
-                    capture_output=True,
-                    text=True,
-                    timeout=240
-                )
+                revisions = ['HEAD']
+            if name_status:
+                options = ['--name-status']
+            else:
+                # histogram is as fast as myers and gives more readable hunks for config edits
+                options = ['--diff-algorithm=histogram']
+            # quotePath=false: show non-ASCII file names as-is instead of octal escapes
+            result = await self._run_git_readonly(['-c', 'core.quotePath=false', 'diff', '--no-renames', '--no-color',
+                                                   *options, *revisions])
             
             if result.returncode != 0:
                 logger.warning(f"git diff returned non-zero exit code: {result.stderr}")
                 return ""
             
+            if cache_key is not None and generation == self._cache_generation:
+                self._diff_cache[cache_key] = result.stdout
             return result.stdout
         except Exception as e:
             logger.error(f"Failed to get diff: {e}")
@@ -1306,6 +1620,9 @@ secrets.yaml
     async def restore_files_from_commit(self, commit_hash: str = None, file_patterns: List[str] = None) -> Dict:
         """Restore files from a specific commit using subprocess (bypasses GitPython issues)
         
+        Runs in a worker thread so the event loop keeps serving requests
+        while git checks files out and they are copied back into /config.
+        
         Args:
             commit_hash: Commit hash to restore from (default: HEAD)
             file_patterns: List of file patterns to restore (e.g., ['*.yaml', 'configuration.yaml'])
@@ -1317,8 +1634,15 @@ secrets.yaml
         if not self.repo or not self.repo.working_dir:
             raise Exception("Git repository not available or working directory missing")
         
+        async with self._write_lock:
+            return await to_thread.run_sync(self._restore_files_from_commit_sync, commit_hash, file_patterns)
+    
+    def _restore_files_from_commit_sync(self, commit_hash: Optional[str], file_patterns: Optional[List[str]]) -> Dict:
+        """Blocking part of restore_files_from_commit"""
         # All Git operations happen in the shadow repo
         repo_path = str(self.repo.working_dir)
+        # checkout.workers=0: let git write files in parallel (one worker per CPU)
+        checkout = ['git', '-c', 'checkout.workers=0', 'checkout']
         
         try:
             # Use HEAD if no commit specified
@@ -1339,20 +1663,34 @@ secrets.yaml
             
             # If file patterns specified, restore only those files
             if file_patterns:
+                # Collect matching files for all patterns with one tree walk
+                result = subprocess.run(
+                    ['git', 'ls-tree', '-r', '-z', '--name-only', commit_hash, '--', *file_patterns],
+                    cwd=repo_path,
+                    capture_output=True,
+                    text=True,
+                    timeout=240
+                )
+                files = []
+                if result.returncode == 0:
+                    files = list(dict.fromkeys(f for f in result.stdout.split('\0') if f))
+                
+                # Restore them with one checkout; if that fails, go file by file
+                # so one bad path doesn't prevent restoring the others
                 restored_files = []
-                for pattern in file_patterns:
-                    # Get list of files matching pattern in commit
-                    result = subprocess.run(
-                        ['git', 'ls-tree', '-r', '--name-only', commit_hash, pattern],
+                if files:
+                    restore_result = subprocess.run(
+                        [*checkout, commit_hash, '--', *files],
                         cwd=repo_path,
                         capture_output=True,
                         text=True,
                         timeout=240
                     )
-                    if result.returncode == 0:
-                        files = [f.strip() for f in result.stdout.split('\n') if f.strip()]
+                    if restore_result.returncode == 0:
+                        restored_files = files
+                        logger.info(f"Restored {len(files)} file(s) in shadow repo: {', '.join(files)}")
+                    else:
                         for file_path in files:
-                            # Restore individual file
                             restore_result = subprocess.run(
                                 ['git', 'checkout', commit_hash, '--', file_path],
                                 cwd=repo_path,
@@ -1368,7 +1706,7 @@ secrets.yaml
             else:
                 # Restore all tracked files from commit
                 result = subprocess.run(
-                    ['git', 'checkout', commit_hash, '--', '.'],
+                    [*checkout, commit_hash, '--', '.'],
                     cwd=repo_path,
                     capture_output=True,
                     text=True,
@@ -1378,23 +1716,8 @@ secrets.yaml
                 if result.returncode != 0:
                     raise Exception(f"Failed to restore files: {result.stderr}")
                 
-                # Get list of restored files
-                status_result = subprocess.run(
-                    ['git', 'status', '--porcelain'],
-                    cwd=repo_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                restored_files = []
-                if status_result.returncode == 0:
-                    for line in status_result.stdout.split('\n'):
-                        if line.strip() and not line.startswith('??'):
-                            # Extract filename (handles both staged and unstaged)
-                            parts = line.strip().split()
-                            if len(parts) >= 2:
-                                restored_files.append(parts[-1])
+                # Restored files are the ones that now differ from HEAD
+                restored_files = [path for _, path in self._changed_paths('HEAD')]
                     
                 logger.info(f"Restored {len(restored_files)} files in shadow repo from commit {commit_hash}")
             
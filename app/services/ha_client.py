@@ -1,8 +1,11 @@
 """Home Assistant API Client"""
 import os
+import asyncio
 import aiohttp
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from app.utils.cache import async_ttl_cache
 
 logger = logging.getLogger('ha_cursor_agent')
 
@@ -22,12 +25,35 @@ class HomeAssistantClient:
         token_source = "provided" if token else ("HA_TOKEN" if os.getenv('HA_TOKEN') else ("SUPERVISOR_TOKEN" if os.getenv('SUPERVISOR_TOKEN') else "none"))
         token_preview = f"{self.token[:20]}..." if self.token else "EMPTY"
         logger.info(f"HAClient initialized - URL: {self.url}, Token source: {token_source}, Token: {token_preview}")
+        
+        # component -> (debounce timer, future resolved by the coalesced reload)
+        self._pending_reloads: Dict[str, Tuple[asyncio.TimerHandle, asyncio.Future]] = {}
+        self._reload_tasks: Set[asyncio.Task] = set()
+        
+        # Shared HTTP session, created on first request (needs a running event loop)
+        self._session: Optional[aiohttp.ClientSession] = None
     
     def set_token(self, token: str):
         """Update token for requests"""
         self.token = token
         self.headers['Authorization'] = f'Bearer {token}'
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """HTTP session shared by all requests, so connections to HA are kept alive"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20))
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    def _invalidate_states(self):
+        """Drop cached states after something may have changed them"""
+        self.get_states.cache_clear()
+        self.get_states_indexed.cache_clear()
+    
     async def _request(
         self,
         method: str,
@@ -56,34 +82,63 @@ class HomeAssistantClient:
         logger.info(f"HA API Request: {method} {url}, Data: {data}, Params: {params}, Timeout: {timeout_seconds}s")
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method, 
-                    url, 
-                    headers=self.headers, 
-                    json=data,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=timeout_seconds)
-                ) as response:
-                    if response.status >= 400:
-                        text = await response.text()
-                        # 404 is often expected (entity not found), log as DEBUG if suppressed
-                        if response.status == 404 and suppress_404_logging:
-                            logger.debug(f"HA API 404 (expected): {text} | URL: {url}")
-                        else:
-                            logger.error(f"HA API error: {response.status} - {text} | URL: {url} | Data: {data} | Params: {params} | Token used: {token_preview}")
-                        raise Exception(f"HA API error: {response.status} - {text}")
-                    
-                    logger.debug(f"HA API success: {method} {url} -> {response.status}")
-                    return await response.json()
+            async with self._get_session().request(
+                method, 
+                url, 
+                headers=self.headers, 
+                json=data,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout_seconds)
+            ) as response:
+                if response.status >= 400:
+                    text = await response.text()
+                    # 404 is often expected (entity not found), log as DEBUG if suppressed
+                    if response.status == 404 and suppress_404_logging:
+                        logger.debug(f"HA API 404 (expected): {text} | URL: {url}")
+                    else:
+                        logger.error(f"HA API error: {response.status} - {text} | URL: {url} | Data: {data} | Params: {params} | Token used: {token_preview}")
+                    raise Exception(f"HA API error: {response.status} - {text}")
+                
+                logger.debug(f"HA API success: {method} {url} -> {response.status}")
+                return await response.json()
         except aiohttp.ClientError as e:
             logger.error(f"Connection error to HA: {e}")
             raise Exception(f"Failed to connect to Home Assistant: {e}")
     
+    @async_ttl_cache(ttl=0.5)
     async def get_states(self) -> List[Dict]:
-        """Get all entity states"""
+        """Get all entity states
+        
+        Results are cached for 0.5 seconds and shared between concurrent
+        callers (one upstream request per burst). Callers must not mutate
+        the returned list. Service calls invalidate the cache.
+        """
         return await self._request('GET', 'states')
     
+    @async_ttl_cache(ttl=1.0)
+    async def get_states_indexed(self) -> Tuple[List[Dict], List[str], Dict[str, List[int]]]:
+        """Get all entity states with a precomputed filter index
+        
+        Results are cached for 1 second and shared between concurrent callers.
+        Callers must not mutate the returned objects.
+        
+        Returns:
+            (states, search_keys, by_domain) where search_keys[i] is
+            "<entity_id>\0<friendly_name>" lowercased for states[i] (one
+            substring check covers both fields) and by_domain maps each
+            domain to its positions in states
+        """
+        states = await self.get_states()
+        search_keys: List[str] = []
+        by_domain: Dict[str, List[int]] = {}
+        for i, state in enumerate(states):
+            entity_id = state.get('entity_id', '')
+            attributes = state.get('attributes')
+            friendly_name = attributes.get('friendly_name') if attributes else None
+            search_keys.append(f"{entity_id}\0{friendly_name or ''}".lower())
+            by_domain.setdefault(entity_id.partition('.')[0], []).append(i)
+        return states, search_keys, by_domain
+    
     async def get_state(self, entity_id: str, suppress_404_logging: bool = False) -> Dict:
         """Get specific entity state
         
@@ -93,8 +148,13 @@ class HomeAssistantClient:
         """
         return await self._request('GET', f'states/{entity_id}', suppress_404_logging=suppress_404_logging)
     
+    @async_ttl_cache(ttl=300.0)
     async def get_services(self) -> List[Dict]:
-        """Get all available services"""
+        """Get all available services
+        
+        Services only change when integrations are loaded or reloaded, so
+        results are cached for 5 minutes (cleared by reload_component/restart).
+        """
         return await self._request('GET', 'services')
     
     async def call_service(self, domain: str, service: str, data: Dict) -> Dict:
@@ -109,7 +169,13 @@ class HomeAssistantClient:
             # Long-running operations need more time
             timeout = 300  # 5 minutes for backup/restore operations
         
-        return await self._request('POST', endpoint, data, params=params, timeout=timeout)
+        try:
+            return await self._request('POST', endpoint, data, params=params, timeout=timeout)
+        finally:
+            self._invalidate_states()
+            # Reloads (e.g. script.reload, homeassistant.reload_config_entry) can change the services list
+            if domain == 'homeassistant' or service == 'reload' or service.startswith('reload_'):
+                self.get_services.cache_clear()
     
     async def get_config(self) -> Dict:
         """Get HA configuration"""
@@ -133,11 +199,58 @@ class HomeAssistantClient:
             raise ValueError(f"Unknown component: {component}")
         
         domain, service = component_map[component]
-        return await self.call_service(domain, service, {})
+        try:
+            return await self.call_service(domain, service, {})
+        finally:
+            # Reloads can register or remove services (e.g. scripts)
+            self.get_services.cache_clear()
+    
+    async def schedule_reload(self, component: str, debounce_ms: int = 250) -> Dict:
+        """Reload a component once things go quiet
+        
+        Calls for the same component within debounce_ms of each other are
+        coalesced into a single reload_component() call, so a burst of
+        edits triggers one reload instead of one per edit. Every caller
+        waits for (and gets the result or error of) that shared reload.
+        """
+        loop = asyncio.get_running_loop()
+        pending = self._pending_reloads.get(component)
+        if pending is not None:
+            pending[0].cancel()
+            future = pending[1]
+        else:
+            future = loop.create_future()
+        handle = loop.call_later(debounce_ms / 1000, self._run_scheduled_reload, component)
+        self._pending_reloads[component] = (handle, future)
+        
+        # Shielded so one cancelled request doesn't cancel the reload for the others
+        return await asyncio.shield(future)
+    
+    def _run_scheduled_reload(self, component: str):
+        """Debounce timer expired - start the coalesced reload"""
+        _, future = self._pending_reloads.pop(component)
+        task = asyncio.ensure_future(self.reload_component(component))
+        self._reload_tasks.add(task)
+        
+        def _done(t: asyncio.Task):
+            self._reload_tasks.discard(t)
+            if future.done():
+                return
+            if t.cancelled():
+                future.cancel()
+            elif t.exception() is not None:
+                future.set_exception(t.exception())
+            else:
+                future.set_result(t.result())
+        
+        task.add_done_callback(_done)
     
     async def restart(self) -> Dict:
         """Restart Home Assistant"""
-        return await self.call_service('homeassistant', 'restart', {})
+        try:
+            return await self.call_service('homeassistant', 'restart', {})
+        finally:
+            self.get_services.cache_clear()
 
     async def get_logbook_entries(
         self,
@@ -190,6 +303,7 @@ class HomeAssistantClient:
                 message['name'] = new_name
             
             result = await ws_client._send_message(message)
+            self._invalidate_states()
             logger.info(f"✅ Successfully renamed entity: {old_entity_id} → {new_entity_id}")
             return result
             
@@ -4,6 +4,8 @@ import aiohttp
 import logging
 from typing import Dict, List, Any, Optional
 
+from app.utils.cache import async_ttl_cache
+
 logger = logging.getLogger('ha_cursor_agent')
 
 class SupervisorClient:
@@ -67,12 +69,16 @@ class SupervisorClient:
     
     # ==================== Add-on Information ====================
     
+    @async_ttl_cache(ttl=2.0)
     async def list_addons(self) -> Dict:
         """Get list of all available add-ons (installed and available)
         
         NOTE: This endpoint returns limited list (installed + some available).
         For full catalog from all repositories, use list_store_addons().
         
+        Results are cached for 2 seconds and shared between concurrent callers.
+        Call list_addons.cache_clear() after changing add-on state.
+        
         Returns:
             {
                 "result": "ok",
@@ -118,14 +124,14 @@ class SupervisorClient:
         """
         return await self._request('GET', f'addons/{slug}/info')
     
-    async def get_addon_logs(self, slug: str) -> str:
+    async def get_addon_logs(self, slug: str) -> bytes:
         """Get add-on logs
         
         Args:
             slug: Add-on slug
         
         Returns:
-            Plain text logs
+            Raw log bytes (UTF-8) - decode only the part you need
         """
         url = f"{self.base_url}/addons/{slug}/logs"
         
@@ -140,7 +146,7 @@ class SupervisorClient:
                         text = await response.text()
                         raise Exception(f"Failed to get logs: {response.status} - {text}")
                     
-                    return await response.text()
+                    return await response.read()
         except aiohttp.ClientError as e:
             raise Exception(f"Failed to get add-on logs: {e}")
     
@@ -158,7 +164,10 @@ class SupervisorClient:
         Note: This can take several minutes depending on add-on size
         """
         logger.info(f"Installing add-on: {slug}")
-        return await self._request('POST', f'addons/{slug}/install', timeout=600)
+        try:
+            return await self._request('POST', f'addons/{slug}/install', timeout=600)
+        finally:
+            self.list_addons.cache_clear()
     
     async def uninstall_addon(self, slug: str) -> Dict:
         """Uninstall an add-on
@@ -167,7 +176,10 @@ class SupervisorClient:
             slug: Add-on slug to uninstall
         """
         logger.info(f"Uninstalling add-on: {slug}")
-        return await self._request('POST', f'addons/{slug}/uninstall', timeout=300)
+        try:
+            return await self._request('POST', f'addons/{slug}/uninstall', timeout=300)
+        finally:
+            self.list_addons.cache_clear()
     
     async def start_addon(self, slug: str) -> Dict:
         """Start an add-on
@@ -176,7 +188,10 @@ class SupervisorClient:
             slug: Add-on slug to start
         """
         logger.info(f"Starting add-on: {slug}")
-        return await self._request('POST', f'addons/{slug}/start')
+        try:
+            return await self._request('POST', f'addons/{slug}/start')
+        finally:
+            self.list_addons.cache_clear()
     
     async def stop_addon(self, slug: str) -> Dict:
         """Stop an add-on
@@ -185,7 +200,10 @@ class SupervisorClient:
             slug: Add-on slug to stop
         """
         logger.info(f"Stopping add-on: {slug}")
-        return await self._request('POST', f'addons/{slug}/stop')
+        try:
+            return await self._request('POST', f'addons/{slug}/stop')
+        finally:
+            self.list_addons.cache_clear()
     
     async def restart_addon(self, slug: str) -> Dict:
         """Restart an add-on
@@ -194,7 +212,10 @@ class SupervisorClient:
             slug: Add-on slug to restart
         """
         logger.info(f"Restarting add-on: {slug}")
-        return await self._request('POST', f'addons/{slug}/restart')
+        try:
+            return await self._request('POST', f'addons/{slug}/restart')
+        finally:
+            self.list_addons.cache_clear()
     
     async def update_addon(self, slug: str) -> Dict:
         """Update an add-on to latest version
@@ -203,7 +224,10 @@ class SupervisorClient:
             slug: Add-on slug to update
         """
         logger.info(f"Updating add-on: {slug}")
-        return await self._request('POST', f'addons/{slug}/update', timeout=600)
+        try:
+            return await self._request('POST', f'addons/{slug}/update', timeout=600)
+        finally:
+            self.list_addons.cache_clear()
     
     # ==================== Add-on Configuration ====================
     
@@ -259,7 +283,7 @@ class SupervisorClient:
 # Global Supervisor client instance
 supervisor_client = SupervisorClient()
 
-async def get_supervisor_client() -> SupervisorClient:
+def get_supervisor_client() -> SupervisorClient:
     """Get Supervisor client instance
     
     Raises:
@@ -0,0 +1,93 @@
+"""Caching utilities"""
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+def async_ttl_cache(ttl: float):
+    """
+    Cache coroutine results for a short time
+
+    Concurrent callers with the same arguments share one in-flight call
+    (single-flight), so a burst of requests results in one upstream fetch.
+    Failed calls are not cached.
+
+    Args:
+        ttl: Seconds a successful result stays cached
+
+    Usage:
+        @async_ttl_cache(ttl=2.0)
+        async def list_addons(self): ...
+
+        list_addons.cache_clear()  # invalidate after mutations
+    """
+    def decorator(func):
+        cache: Dict[Any, Tuple[float, Any]] = {}
+        inflight: Dict[Any, asyncio.Future] = {}
+        generation = 0
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+
+            entry = cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            future = inflight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(func(*args, **kwargs))
+                inflight[key] = future
+                started_in = generation
+
+                def _store(f: asyncio.Future):
+                    if inflight.get(key) is f:
+                        del inflight[key]
+                    # Drop results that raced with cache_clear()
+                    if f.cancelled() or f.exception() is not None or started_in != generation:
+                        return
+                    cache[key] = (time.monotonic() + ttl, f.result())
+
+                future.add_done_callback(_store)
+
+            return await asyncio.shield(future)
+
+        def cache_clear():
+            nonlocal generation
+            generation += 1
+            cache.clear()
+            inflight.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+class LRUDict(OrderedDict):
+    """
+    Dict that keeps only the maxsize most recently used entries
+
+    Usage:
+        cache = LRUDict(maxsize=32)
+        cache[key] = value
+        value = cache.get(key)  # marks key as recently used
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
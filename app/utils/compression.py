@@ -0,0 +1,32 @@
+"""Response compression"""
+from typing import Tuple
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class PathGZipMiddleware:
+    """
+    GZipMiddleware limited to requests under the given path prefixes
+
+    Responses that already set Content-Encoding (e.g. precompressed
+    instructions) are passed through untouched by GZipMiddleware.
+
+    Args:
+        app: ASGI app
+        prefixes: URL path prefixes to compress
+        minimum_size: Smallest body (bytes) worth compressing
+        compresslevel: gzip level
+    """
+
+    def __init__(self, app: ASGIApp, prefixes: Tuple[str, ...], minimum_size: int = 1024,
+                 compresslevel: int = 6) -> None:
+        self.app = app
+        self.prefixes = prefixes
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefixes):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,145 @@
+"""Response helpers for large JSON payloads"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:
+    # orjson is only installed where prebuilt wheels exist (see requirements.txt)
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback for values YAML can produce (dates, datetimes, !!set)"""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes (orjson when available)
+
+    Non-string dict keys (e.g. YAML `1:` or `on:`) are converted to strings
+    dates to ISO format and sets to lists, with either backend.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with json_dumps (orjson when available)"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def json_response(success: bool, message: Optional[str] = None, data: Any = None, **kwargs) -> FastJSONResponse:
+    """
+    Build a generic Response-shaped JSON body, serialized directly
+
+    Returning a Response object makes FastAPI skip Pydantic validation and
+    jsonable_encoder, which matters for endpoints that return large lists
+    of already-trusted dicts from Home Assistant. Endpoints can keep
+    response_model=Response for the OpenAPI schema.
+
+    Args:
+        success: Operation result
+        message: Human-readable message
+        data: Payload (must be JSON-serializable)
+        **kwargs: Passed to the response class (e.g. headers, status_code)
+    """
+    return FastJSONResponse({'success': success, 'message': message, 'data': data}, **kwargs)
+
+
+def ndjson_response(meta: Dict[str, Any], rows: Iterable[Any]) -> StreamingResponse:
+    """
+    Stream rows as newline-delimited JSON (application/x-ndjson)
+
+    The first line is {"kind": "meta", **meta}; every following line is one
+    row. Rows are encoded as they are sent instead of building the whole
+    document in memory first.
+    """
+    async def generate():
+        yield json_dumps({'kind': 'meta', **meta}) + b'\n'
+        for row in rows:
+            yield json_dumps(row) + b'\n'
+
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header contains etag"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    return header.strip() == '*' or etag in (t.strip() for t in header.split(','))
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    """Check whether the client's Accept-Encoding allows encoding (e.g. 'gzip')"""
+    for part in request.headers.get('accept-encoding', '').split(','):
+        name, _, params = part.partition(';')
+        if name.strip().lower() == encoding:
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Empty 304 Not Modified (headers should include the ETag)"""
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_response(request: Request, body: bytes, etag: str, media_type: str,
+                         cache_control: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Return body with ETag/Cache-Control, or an empty 304 if the client has it"""
+    headers = {**(headers or {}), 'ETag': etag, 'Cache-Control': cache_control}
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+# key -> (source object, encoded body, etag)
+_ENCODED_CACHE: Dict[Hashable, Tuple[Any, bytes, str]] = {}
+
+
+def cached_json_response(request: Request, key: Hashable, source: Any, build: Callable[[], Any],
+                         cache_control: str = 'private, max-age=2') -> Response:
+    """
+    JSON response with ETag support, encoded once per source object
+
+    The encoded body is reused as long as `source` is the same object -
+    e.g. a result served from an async_ttl_cache - so polling clients
+    neither re-encode the payload nor re-download it (304).
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        key: Cache slot for this endpoint/variant
+        source: Object the payload is derived from
+        build: Returns the payload to encode
+        cache_control: Cache-Control header value
+    """
+    entry = _ENCODED_CACHE.get(key)
+    if entry is None or entry[0] is not source:
+        body = json_dumps(build())
+        entry = _ENCODED_CACHE[key] = (source, body, make_etag(body))
+    return conditional_response(request, entry[1], entry[2], 'application/json', cache_control)